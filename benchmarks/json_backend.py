@@ -0,0 +1,104 @@
+"""
+Benchmark of the JSON backends of cdda_tools.json_utils.
+
+Reads all JSON files of the test save (or of the given directories)
+with every installed backend, and checks that the parsed data is identical
+to the data parsed by the standard library, including the types of numbers.
+The baseline is the standard library's json.load with default options.
+
+Only reading is accelerated by the backends. Files are always written
+with the standard library, so that written files do not depend on the backend.
+
+Usage:
+
+  python benchmarks/json_backend.py [DIR ...]
+"""
+import glob
+import json
+import shutil
+import sys
+import tempfile
+import time
+from os import path
+
+from cdda_tools import json_utils
+
+TEST_SAVE = path.join(path.dirname(__file__), "..", "tests", "test_data", "save.tar.gz")
+PATTERNS = ["*.json", "*.sav", "*.seen", "*.map", "o.*"]
+REPEATS = 3
+
+
+def main(dirs):
+    """Run the benchmark on all save files in the given directories"""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        if len(dirs) == 0:
+            shutil.unpack_archive(TEST_SAVE, temp_dir)
+            dirs = [temp_dir]
+
+        files = _save_files(dirs)
+        size = sum(path.getsize(f) for f in files)
+        print("{} files, {:.1f} MB".format(len(files), size / 1e6))
+
+        json_utils.set_backend("json")
+        reference = [_canonical(json_utils.read_json(f)) for f in files]
+
+        print("{:>8} | {:>8} | {}".format("backend", "read", "output"))
+        print(
+            "{:>8} | {:>7.3f}s | {}".format(
+                "baseline", _time(lambda: [_stdlib_load(f) for f in files]), "-"
+            )
+        )
+        for name in json_utils.BACKENDS:
+            json_utils.set_backend(name)
+            read_time = _time(lambda: [json_utils.read_json(f) for f in files])
+
+            identical = all(
+                _canonical(json_utils.read_json(f)) == ref
+                for f, ref in zip(files, reference)
+            )
+            print(
+                "{:>8} | {:>7.3f}s | {}".format(
+                    name,
+                    read_time,
+                    "identical" if identical else "DIFFERENT",
+                )
+            )
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def _save_files(dirs):
+    files = []
+    for directory in dirs:
+        for pattern in PATTERNS:
+            files.extend(glob.glob(path.join(directory, "**", pattern), recursive=True))
+    return sorted(set(files))
+
+
+def _time(func):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def _canonical(data):
+    """Serialization that distinguishes all parsed values, e.g. 1 from 1.0"""
+    return json.dumps(data)
+
+
+def _stdlib_load(file_path):
+    content, _ = json_utils.compression.read_file(file_path)
+    text = content.decode("utf-8")
+    if text.startswith("#"):
+        # skip the version header of save files
+        text = text[text.index("\n") + 1 :]
+    return json.loads(text)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
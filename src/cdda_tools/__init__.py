@@ -2,7 +2,18 @@
 Cataclysm DDA Python tools, package entrypoint.
 """
 
-from . import cli, commands, game, json_utils
+from . import (
+    cache,
+    cli,
+    commands,
+    compact,
+    game,
+    globs,
+    inheritance,
+    json_utils,
+    parallel,
+    world,
+)
 
 try:
     from ._version import __version__
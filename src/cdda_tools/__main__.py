@@ -4,7 +4,7 @@ Cataclysm DDA Python tools, CLI entrypoint.
 import sys
 import traceback
 
-from . import cli
+from . import cli, json_utils
 
 if __name__ == "__main__":
     args = cli.parse_args()
@@ -23,4 +23,17 @@ if __name__ == "__main__":
             )
         sys.exit(1)
 
+    if debug:
+        stats = json_utils.STATS
+        print(
+            "Read {} JSON files, {} bytes. Wrote {} files, {} bytes, {} unchanged".format(
+                stats.files_read,
+                stats.bytes_read,
+                stats.files_written,
+                stats.bytes_written,
+                stats.files_unchanged,
+            ),
+            file=sys.stderr,
+        )
+
     sys.exit(0)
@@ -0,0 +1,98 @@
+"""Persistent and in-memory caches for parsed game and world data"""
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from os import path
+
+CACHE_VERSION = 1
+
+_MEMORY = None
+
+
+def file_stamp(file_path):
+    """File size and modification time in ns, used to detect changed files"""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def cache_file(cache_dir, kind, key):
+    """Path of the cache file for a kind of cache and a key (directory path or list of paths)"""
+    if isinstance(key, str):
+        key = [key]
+    key = "\n".join(path.abspath(k) for k in key)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return path.join(cache_dir, "{}_{}.pickle".format(kind, digest))
+
+
+def load(file_path):
+    """Load a cache file. Returns None if it is missing, unreadable or outdated."""
+    try:
+        with open(file_path, "rb") as file:
+            content = pickle.load(file)
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+    if not isinstance(content, dict) or content.get("version") != CACHE_VERSION:
+        return None
+    return content["data"]
+
+
+def store(file_path, data):
+    """Store data in a cache file, replacing it atomically"""
+    cache_dir = path.dirname(file_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    handle, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            pickle.dump(
+                {"version": CACHE_VERSION, "data": data},
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temp_path, file_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+class MemoryCache:
+    """In-memory cache of values derived from files, validated by a stamp of the files"""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self._entries = {}
+
+    def get(self, key, stamp, loader):
+        """Get the cached value for a key, or call loader() if missing or the stamp changed"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        value = loader()
+        self._entries[key] = (stamp, value)
+        return value
+
+
+def memory():
+    """The active in-memory cache, or None if data is not kept in memory"""
+    return _MEMORY
+
+
+@contextlib.contextmanager
+def keep_in_memory():
+    """
+    Keep parsed game data and world files in memory while the context is active.
+    Values from the cache are shared and must not be modified.
+    """
+    global _MEMORY  # pylint: disable=global-statement
+    previous = _MEMORY
+    if _MEMORY is None:
+        _MEMORY = MemoryCache()
+    try:
+        yield _MEMORY
+    finally:
+        _MEMORY = previous
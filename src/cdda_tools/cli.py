@@ -6,6 +6,7 @@ import argparse
 from . import commands
 
 COMMANDS = {
+    "batch": commands.Batch(),
     "copy-player": commands.CopyPlayer(),
     "copy-vehicle": commands.CopyVehicle(),
     "note": commands.Note(),
@@ -13,6 +14,7 @@ COMMANDS = {
     "find": commands.Find(),
     "list": commands.List(),
     "player": commands.InspectPlayer(),
+    "serve": commands.Serve(),
     "show-data": commands.ShowData(),
     "table": commands.Table(),
     "vehicle-mod": commands.VehicleMod(),
@@ -21,7 +23,10 @@ COMMANDS = {
 
 def run_cli(args):
     """Run the CLI with parsed arguments (see parse_args(args))"""
-    yield from COMMANDS[args.subcommand].exec(args)
+    if getattr(args, "server", None) is not None:
+        yield from commands.serve.run_remote(args)
+    else:
+        yield from COMMANDS[args.subcommand].exec(args)
 
 
 def parse_args(args=None) -> argparse.Namespace:
@@ -43,6 +48,36 @@ def _create_parser() -> argparse.ArgumentParser:
         default=".",
         help="game directory, default '.'",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="directory for persistent caches of parsed game data;\n"
+        "caching is disabled if not given",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="number of worker processes for parsing game data\n"
+        "and searching world files, default 1",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="compact in-memory representation of game data, with shared values;\n"
+        "reduces memory use of long-running processes",
+    )
+    parser.add_argument(
+        "--skip-missing-mods",
+        action="store_true",
+        help="skip mods of a world that are not installed, instead of failing",
+    )
+    parser.add_argument(
+        "--server",
+        type=str,
+        help="execute the command by the server listening on this socket (see 'serve')",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
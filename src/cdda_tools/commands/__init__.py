@@ -3,6 +3,7 @@ CLI commands.
 """
 # pylint: disable=cyclic-import
 from . import util
+from .batch import Batch
 from .command import Command
 from .copy_player import CopyPlayer
 from .copy_vehicle import CopyVehicle
@@ -11,6 +12,7 @@ from .inspect_player import InspectPlayer
 from .list import List
 from .note import Note
 from .notes import Notes
+from .serve import Serve
 from .show_data import ShowData
 from .table import Table
 from .vehicle_mod import VehicleMod
@@ -0,0 +1,95 @@
+"""Run many commands in one process."""
+import argparse
+import shlex
+import sys
+import traceback
+
+from .. import cache
+from .command import Command
+
+NO_BATCH = ("batch", "serve")
+
+
+class Batch(Command):
+    """Run many commands in one process."""
+
+    def add_subcommand(self, subparsers):
+        parser = subparsers.add_parser(
+            "batch",
+            help="Run commands from a file or stdin, one per line.",
+            description="Run commands from a file or stdin, one per line.\n\n"
+            "Game data and world files are read only once and shared between commands.\n"
+            "Global options given to 'batch' apply to all commands, unless overridden.\n"
+            "Empty lines and lines starting with '#' are ignored.\n\n"
+            "Example:\n\n"
+            "  cdda_tools batch commands.txt\n\n"
+            "with commands.txt:\n\n"
+            "  show-data ids *wrench* --list\n"
+            "  table TOOL/rapier TOOL/sword_bayonet --columns bashing cutting",
+            formatter_class=argparse.RawTextHelpFormatter,
+        )
+
+        parser.add_argument(
+            "file",
+            type=str,
+            nargs="?",
+            default="-",
+            help="file with one command per line, default '-' (stdin)",
+        )
+
+    def exec(self, arg):
+        from .. import cli  # pylint: disable=import-outside-toplevel
+
+        if arg.file == "-":
+            lines = sys.stdin.readlines()
+        else:
+            with open(arg.file, encoding="utf-8") as file:
+                lines = file.readlines()
+
+        defaults = _global_options(arg)
+        commands = 0
+        failed = 0
+
+        with cache.keep_in_memory():
+            for line in lines:
+                command = shlex.split(line, comments=True)
+                if len(command) == 0:
+                    continue
+
+                commands += 1
+                yield "----- {} -----".format(" ".join(command))
+                try:
+                    args = cli.parse_args(defaults + command)
+                    if args.subcommand in NO_BATCH:
+                        raise ValueError(
+                            "Command '{}' can't be run in batch mode".format(
+                                args.subcommand
+                            )
+                        )
+                    yield from cli.run_cli(args)
+                except SystemExit:
+                    failed += 1
+                    yield "Invalid command (see error message above)"
+                except Exception as err:  # pylint: disable=broad-except
+                    failed += 1
+                    if arg.debug:
+                        yield traceback.format_exc().rstrip()
+                    else:
+                        yield f"{err.__class__.__name__}: {str(err)}"
+
+        if failed > 0:
+            raise ValueError("{} of {} commands failed".format(failed, commands))
+
+
+def _global_options(arg):
+    """Global options of the batch invocation, as defaults for all commands"""
+    options = ["--dir", arg.dir, "--jobs", str(arg.jobs)]
+    if arg.cache_dir is not None:
+        options += ["--cache-dir", arg.cache_dir]
+    if arg.compact:
+        options.append("--compact")
+    if arg.skip_missing_mods:
+        options.append("--skip-missing-mods")
+    if arg.debug:
+        options.append("--debug")
+    return options
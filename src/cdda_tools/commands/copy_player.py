@@ -106,16 +106,18 @@ class CopyPlayer(Command):
 
     def exec(self, arg):
         world_dir_1 = util.get_world_path(arg.dir, arg.world)
-        save_1, _, player_1 = util.get_save_path(world_dir_1, arg.player)
+        save_1, _, player_1 = util.get_save_path(world_dir_1, arg.player, arg.cache_dir)
 
         world_dir_2 = util.get_world_path(arg.dir, arg.world2)
-        save_2, _, player_2 = util.get_save_path(world_dir_2, arg.player2)
+        save_2, _, player_2 = util.get_save_path(
+            world_dir_2, arg.player2, arg.cache_dir
+        )
 
         yield "Copying player {} ({}) -> {} ({})".format(
             player_1, world_dir_1, player_2, world_dir_2
         )
 
-        source = json.read_json(save_1)
+        source = util.read_world_json(save_1)
         target = json.read_json(save_2)
 
         for prop in PROPERTIES:
@@ -132,7 +134,8 @@ class CopyPlayer(Command):
             yield "Skip writing back to player file (--dry)"
         else:
             yield "Writing back to player file"
-            json.write_json(target, save_2)
+            if not json.write_json(target, save_2):
+                yield "Player file is unchanged, skipped writing"
 
         yield "Successfully copied player {} ({}) -> {} ({})".format(
             player_1, world_dir_1, player_2, world_dir_2
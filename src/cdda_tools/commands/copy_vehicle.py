@@ -1,6 +1,5 @@
 """Copy a vehicle between worlds"""
 import argparse
-from os import path
 
 from .. import json_utils as json
 from . import Command, util
@@ -55,21 +54,23 @@ class CopyVehicle(Command):
             arg.vehicle, world_dir_1
         )
 
-        source_path = path.join(world_dir_1, util.MAPS_DIR)
-        source_maps = util.find_files_with_text(source_path, arg.vehicle)
+        source_maps = util.find_vehicle_files(
+            world_dir_1, arg.vehicle, arg.cache_dir, arg.jobs
+        )
         util.check_is_single_vehicle_source(source_maps, arg.vehicle)
 
         yield "Searching for map tile of target vehicle {} ({})".format(
             arg.vehicle2, world_dir_2
         )
 
-        target_path = path.join(world_dir_2, util.MAPS_DIR)
-        target_maps = util.find_files_with_text(target_path, arg.vehicle2)
+        target_maps = util.find_vehicle_files(
+            world_dir_2, arg.vehicle2, arg.cache_dir, arg.jobs
+        )
         util.check_is_single_vehicle_source(target_maps, arg.vehicle2)
 
         yield "Extracting vehicles"
 
-        sources = json.read_json(source_maps[0])
+        sources = util.read_world_json(source_maps[0])
         targets = json.read_json(target_maps[0])
 
         source_vehicle = _find_vehicle(sources, arg.vehicle)
@@ -88,7 +89,8 @@ class CopyVehicle(Command):
             yield "Skip writing back to file {} (--dry)".format(target_maps[0])
         else:
             yield "Writing back to file {}".format(target_maps[0])
-            json.write_json(targets, target_maps[0])
+            if not json.write_json(targets, target_maps[0]):
+                yield "File is unchanged, skipped writing"
 
         yield "Successfully copied vehicle {} ({}) -> {} ({})".format(
             arg.vehicle, world_dir_1, arg.vehicle2, world_dir_2
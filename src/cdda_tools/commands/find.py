@@ -1,12 +1,15 @@
 """Find Overmap features"""
 import argparse
+import collections
 import glob
-from fnmatch import translate
+import heapq
+import itertools
+import math
 from os import path
 
-import regex
-
+from .. import globs
 from .. import json_utils as json
+from .. import parallel, world
 from . import Command, util
 
 
@@ -39,10 +42,13 @@ class Find(Command):
         )
 
         _add_parser_terrain(subparsers)
+        _add_parser_items(subparsers)
 
     def exec(self, arg):
         if arg.find_subcommand == "terrain":
             yield from find_terrain(arg)
+        elif arg.find_subcommand == "items":
+            yield from find_items(arg)
         else:
             raise ValueError(
                 "Unknown find sub-command '{}'.".format(arg.find_subparser)
@@ -71,54 +77,284 @@ def _add_parser_terrain(subparsers):
         action="store_true",
         help="search also for unseen terrain (could be considered cheating!)",
     )
+    parser_terrain.add_argument(
+        "--near",
+        action="store_true",
+        help="sort results by distance from the player's position, nearest first",
+    )
+    parser_terrain.add_argument(
+        "--limit",
+        "-n",
+        type=int,
+        help="maximum number of results; with --near, the nearest ones",
+    )
+
+
+def _add_parser_items(subparsers):
+    parser_items = subparsers.add_parser(
+        "items",
+        help="Find items by glob patterns (could be considered cheating!).",
+        description="Find items by glob patterns (could be considered cheating!).\n\n"
+        "Searches all map files of the world, including items in containers.\n"
+        "Reports item counts per overmap tile.\n\n"
+        "Example:\n\n"
+        "  cdda_tools find -w MyWorld items *wrench* --rect 0'0 0'0 1'179 1'179 -z 0",
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser_items.add_argument(
+        "patterns",
+        type=str,
+        nargs="+",
+        help="glob patterns for item ids to search for",
+    )
+
+    util.add_z_level_options(parser_items)
+
+    util.add_rect_option(parser_items, "search only in a rectangle of overmap tiles")
+
+
+def find_items(arg):
+    """Execute the find items command"""
+    util.check_levels(arg.z_levels)
+    world_dir = util.get_world_path(arg.dir, arg.world)
+
+    rect = None if arg.rect is None else util.parse_rect(arg.rect)
+    files = _select_map_files(world_dir, set(arg.z_levels), rect)
+    counts = _count_items(files, arg.patterns, arg.jobs)
+
+    if not counts:
+        yield f"No items found for globs {arg.patterns}"
+
+    for (x_coord, y_coord, level, item_id), count in sorted(counts.items()):
+        x_major, x_sub = divmod(x_coord, util.OVERMAP_SIZE)
+        y_major, y_sub = divmod(y_coord, util.OVERMAP_SIZE)
+        yield "{}'{}, {}'{}, {}: {:>4}  {}".format(
+            x_major, x_sub, y_major, y_sub, level, count, item_id
+        )
+
+
+def _select_map_files(world_dir, levels, rect):
+    """Map files of a world on the given z-levels, and in a rectangle (x1, y1, x2, y2) if given"""
+    maps_dir = path.join(world_dir, util.MAPS_DIR)
+    if rect is None:
+        candidates = world.map_files(maps_dir)
+    else:
+        candidates = _rect_map_files(maps_dir, levels, rect)
+
+    files = []
+    for file in candidates:
+        x_coord, y_coord, level = _map_file_coords(file)
+        if level not in levels:
+            continue
+        if rect is not None and not (
+            rect[0] <= x_coord <= rect[2] and rect[1] <= y_coord <= rect[3]
+        ):
+            continue
+        files.append(file)
+    return files
+
+
+def _rect_map_files(maps_dir, levels, rect):
+    """Map files in the map chunk directories covering a rectangle, on the given z-levels"""
+    chunk_x1, chunk_y1 = util.map_to_chunk(rect[0], rect[1])
+    chunk_x2, chunk_y2 = util.map_to_chunk(rect[2], rect[3])
+    for level in sorted(levels):
+        for chunk_x in range(chunk_x1, chunk_x2 + 1):
+            for chunk_y in range(chunk_y1, chunk_y2 + 1):
+                chunk_dir = path.join(
+                    maps_dir, "{}.{}.{}".format(chunk_x, chunk_y, level)
+                )
+                yield from world.map_files(chunk_dir)
+
+
+def _count_items(files, patterns, workers):
+    """
+    Count items matching glob patterns in map files, by (x, y, z, item id) of overmap tiles.
+    With more than one worker, batches of files are searched in worker processes,
+    and their partial counts are merged.
+    """
+    counts = collections.Counter()
+    for partial in parallel.map_batches(_count_items_batch, files, workers, patterns):
+        counts.update(partial)
+    return counts
+
+
+def _count_items_batch(files, patterns):
+    """Count items in a batch of map files, see _count_items. Runs in worker processes."""
+    matcher = globs.GlobMatcher(patterns)
 
+    counts = collections.Counter()
+    for file in files:
+        tile = _map_file_coords(file)
+        for submap in json.read_json(file):
+            for _, _, item, count in world.submap_items(submap):
+                item_id = item.get("typeid")
+                if item_id is not None and matcher(item_id):
+                    counts[(*tile, item_id)] += count
+    return counts
 
-def _is_seen(seen_layer, index):
-    pos = 0
-    for seen, run_length in seen_layer:
-        if index < pos + run_length:
-            return seen
-        pos += run_length
-    raise ValueError("Index {} out of range of seen layer (len=pos).".format(index))
+
+def _map_file_coords(map_file):
+    """Overmap tile coordinates (x, y, z) of a map file, from its name"""
+    return tuple(map(int, path.basename(map_file).split(".")[:3]))
 
 
 def find_terrain(arg):
     """Execute the find terrain command"""
     # pylint: disable=too-many-locals
     util.check_levels(arg.z_levels)
+    if arg.limit is not None and arg.limit < 1:
+        raise ValueError("Option --limit must be at least 1, got {}".format(arg.limit))
 
     world_dir = util.get_world_path(arg.dir, arg.world)
-    _, save_name, _ = util.get_save_path(world_dir, arg.player)
+    save, save_name, _ = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
     seen_files = glob.glob(path.join(world_dir, "{}.seen.*.*".format(save_name)))
-    seen_coords = [list(map(int, f.split(".")[-2:])) for f in seen_files]
-    files_overmap = [path.join(world_dir, "o.{}.{}".format(*xy)) for xy in seen_coords]
+    overmaps = [
+        (path.join(world_dir, "o.{}.{}".format(*_overmap_coords(f))), f)
+        for f in seen_files
+    ]
+
+    matcher = globs.GlobMatcher(arg.patterns)
+
+    if arg.near:
+        position = util.get_player_position(save)
+        overmaps.sort(key=lambda files: _overmap_distance(position, files[0]))
+
+    if arg.cache_dir is None:
+        found = _find_terrain(arg, matcher, overmaps)
+    else:
+        found = _find_terrain_indexed(arg, matcher, world_dir, overmaps)
+
+    if arg.near:
+        for distance, result in _nearest(found, overmaps, position, arg.limit):
+            yield "{} ({:.1f})".format(_format_terrain(*result), distance)
+    else:
+        results = (result for overmap in found for result in overmap)
+        for result in itertools.islice(results, arg.limit):
+            yield _format_terrain(*result)
+
+
+def _format_terrain(coord, level, index, terrain):
+    x_sub, y_sub = util.index_to_xy_overmap(index)
+    return "{}'{}, {}'{}, {}: {}".format(
+        coord[0], x_sub, coord[1], y_sub, level, terrain
+    )
+
+
+def _nearest(found, overmaps, position, limit):
+    """
+    Sort results by distance from a position, keeping only the nearest limit results.
+    Overmaps must be sorted by distance. Stops visiting overmaps as soon as
+    no further overmap can contain results nearer than the limit-th result.
+    Returns a list of (distance, result).
+    """
+    # max-heap of the nearest results by negated distance; on ties, earlier results win
+    heap = []
+    counter = itertools.count()
+    for i, results in enumerate(found):
+        for result in results:
+            distance = _tile_distance(position, result[0], result[2])
+            item = (-distance, -next(counter), result)
+            if limit is None or len(heap) < limit:
+                heapq.heappush(heap, item)
+            elif item > heap[0]:
+                heapq.heapreplace(heap, item)
+
+        if (
+            limit is not None
+            and len(heap) >= limit
+            and i + 1 < len(overmaps)
+            and _overmap_distance(position, overmaps[i + 1][0]) > -heap[0][0]
+        ):
+            break
+
+    return [(-dist, result) for dist, _, result in sorted(heap, reverse=True)]
+
+
+def _tile_distance(position, coord, index):
+    x_sub, y_sub = util.index_to_xy_overmap(index)
+    return math.hypot(
+        coord[0] * util.OVERMAP_SIZE + x_sub - position[0],
+        coord[1] * util.OVERMAP_SIZE + y_sub - position[1],
+    )
+
 
-    rex = [regex.compile(translate(pat)) for pat in arg.patterns]
+def _overmap_distance(position, overmap_file):
+    """Lower bound of the distance from a position to any tile of an overmap"""
+    distances = []
+    for pos, coord in zip(position, _overmap_coords(overmap_file)):
+        start = coord * util.OVERMAP_SIZE
+        distances.append(max(start - pos, 0, pos - (start + util.OVERMAP_SIZE - 1)))
+    return math.hypot(*distances)
 
-    # pylint: disable=too-many-nested-blocks
-    for map_file, seen_file, coord in zip(files_overmap, seen_files, seen_coords):
-        map_json = json.read_json(map_file)
-        seen_json = json.read_json(seen_file)
+
+def _find_terrain(arg, matcher, overmaps):
+    """
+    Find terrain in overmaps, given as (overmap file, seen file).
+    Yields a list of results (overmap coords, level, tile index, terrain id) per overmap.
+    """
+    # pylint: disable=too-many-locals
+    table = world.TerrainTable()
+
+    for map_file, seen_file in overmaps:
+        coord = _overmap_coords(map_file)
+        results = []
+        map_json = util.read_world_json(map_file)
+        seen_json = util.read_world_json(seen_file)
         layers = map_json["layers"]
         seen_layers = seen_json["visible"]
         for level in arg.z_levels:
-            layer = layers[level + 10]
-            seen_layer = seen_layers[level + 10]
-            pos = 0
-            for rle in layer:
-                match = False
-                for expr in rex:
-                    if regex.match(expr, rle[0]):
-                        match = True
-                        break
-                if match:
-                    for i in range(rle[1]):
-                        index = pos + i
-                        if arg.unseen or _is_seen(seen_layer, index):
-                            x_sub, y_sub = util.index_to_xy_overmap(index)
-                            yield "{}'{}, {}'{}, {}: {}".format(
-                                coord[0], x_sub, coord[1], y_sub, level, rle[0]
-                            )
-
-                pos += rle[1]
+            layer = world.TerrainLayer(layers[level + 10], table)
+            found = layer.mask(
+                {code for code in layer.codes if matcher(table.terrains[code])}
+            )
+            if not arg.unseen and found:
+                found &= world.rle_mask(seen_layers[level + 10])
+
+            for index in world.mask_indices(found):
+                results.append((coord, level, index, layer.terrain(index)))
+        yield results
+
+
+def _find_terrain_indexed(arg, matcher, world_dir, overmaps):
+    """Find terrain using the world's terrain index and seen index, see _find_terrain"""
+    # pylint: disable=too-many-locals
+    terrain_index = world.read_terrain_index(
+        world_dir, [files[0] for files in overmaps], arg.cache_dir
+    )
+    seen_index = None
+    if not arg.unseen:
+        seen_index = world.read_seen_index(
+            world_dir, [files[1] for files in overmaps], arg.cache_dir
+        )
+
+    for map_file, seen_file in overmaps:
+        coord = _overmap_coords(map_file)
+        results = []
+        for level in arg.z_levels:
+            runs = []
+            for terrain, packed in terrain_index[map_file][level + 10].items():
+                if matcher(terrain):
+                    runs.extend(
+                        (packed[i], packed[i + 1], terrain)
+                        for i in range(0, len(packed), 2)
+                    )
+            if len(runs) == 0:
+                continue
+            runs.sort()
+
+            seen = None
+            if seen_index is not None:
+                # bit string in tile order, with "1" for seen tiles
+                seen = world.mask_bits(seen_index[seen_file][level + 10])
+
+            for start, length, terrain in runs:
+                for index in range(start, start + length):
+                    if seen is None or (index < len(seen) and seen[index] == "1"):
+                        results.append((coord, level, index, terrain))
+        yield results
+
+
+def _overmap_coords(overmap_file):
+    return list(map(int, overmap_file.split(".")[-2:]))
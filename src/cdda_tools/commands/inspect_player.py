@@ -3,7 +3,6 @@ import argparse
 import json
 import math
 
-from .. import game, json_utils
 from . import Command, util
 
 
@@ -60,9 +59,9 @@ class InspectPlayer(Command):
 
 def _profs(arg):
     world_dir = util.get_world_path(arg.dir, arg.world)
-    save, _, _player_name = util.get_save_path(world_dir, arg.player)
+    save, _, _player_name = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
-    source = json_utils.read_json(save)
+    source = util.read_world_json(save)
     player = source["player"]
     profs = player["proficiencies"]
 
@@ -73,7 +72,7 @@ def _profs(arg):
         for prof in profs["learning"]:
             yield "{:30} {} h".format(prof["id"], round(prof["practiced"] / 3600, 1))
     else:
-        data = game.read_game_data(arg.dir, ["proficiency"])
+        data = util.read_game_data(arg, ["proficiency"])
         all_profs = data["proficiency"]
 
         for prof in profs["learning"]:
@@ -85,9 +84,9 @@ def _profs(arg):
 
 def _stats(arg):
     world_dir = util.get_world_path(arg.dir, arg.world)
-    save, _, _player_name = util.get_save_path(world_dir, arg.player)
+    save, _, _player_name = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
-    source = json_utils.read_json(save)
+    source = util.read_world_json(save)
     player = source["player"]
 
     yield "Str {:2}/{:2}".format(player["str_cur"], player["str_max"])
@@ -98,9 +97,9 @@ def _stats(arg):
 
 def _skills(arg):
     world_dir = util.get_world_path(arg.dir, arg.world)
-    save, _, _player_name = util.get_save_path(world_dir, arg.player)
+    save, _, _player_name = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
-    source = json_utils.read_json(save)
+    source = util.read_world_json(save)
     player = source["player"]
     skills = player["skills"]
 
@@ -117,9 +116,9 @@ def _skills(arg):
 
 def _body(arg):
     world_dir = util.get_world_path(arg.dir, arg.world)
-    save, _, _player_name = util.get_save_path(world_dir, arg.player)
+    save, _, _player_name = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
-    source = json_utils.read_json(save)
+    source = util.read_world_json(save)
     player = source["player"]
     body = player["body"]
 
@@ -134,9 +133,9 @@ def _body(arg):
 def _path(arg):
     # pylint: disable=duplicate-code
     world_dir = util.get_world_path(arg.dir, arg.world)
-    save, _, _player_name = util.get_save_path(world_dir, arg.player)
+    save, _, _player_name = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
-    source = json_utils.read_json(save)
+    source = util.read_world_json(save)
     player = source["player"]
 
     extract = player
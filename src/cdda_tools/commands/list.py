@@ -1,8 +1,10 @@
 """List items on Overmap tile."""
 import argparse
+import collections
 import os.path
 
 from .. import json_utils as json
+from .. import parallel, world
 from . import Command, util
 
 
@@ -14,64 +16,100 @@ class List(Command):
             "list",
             help="List things at an overmap position (could be considered cheating!).",
             description="List things at an overmap position (could be considered cheating!).\n\n"
-            "Example:\n\n"
-            "  cdda_tools list -w MyWorld \" -1'123\" 1'10",
+            "With --radius around x, y or with --rect instead of x, y,\n"
+            "things in an area of overmap tiles are listed.\n\n"
+            "Examples:\n\n"
+            "  cdda_tools list -w MyWorld \" -1'123\" 1'10\n"
+            "  cdda_tools list -w MyWorld \" -1'123\" 1'10 --radius 2\n"
+            "  cdda_tools list -w MyWorld --rect \" -1'130\" 1'10 \" -1'123\" 1'20",
             formatter_class=argparse.RawTextHelpFormatter,
         )
 
         util.add_world_option(parser, "the game world search in")
 
-        util.add_xy_options(parser)
+        util.add_xy_options(parser, optional=True)
 
         util.add_z_level_options(parser)
 
+        area = parser.add_mutually_exclusive_group()
+        area.add_argument(
+            "--radius",
+            "-r",
+            type=int,
+            help="list things in a square of overmap tiles with this radius around x, y",
+        )
+        util.add_rect_option(area, "list things in a rectangle of overmap tiles")
+
     def exec(self, arg):
-        # pylint: disable=too-many-locals
         world_dir = util.get_world_path(arg.dir, arg.world)
 
         util.check_levels(arg.z_levels)
 
-        x_parts = list(map(int, arg.x.split("'")))
-        y_parts = list(map(int, arg.y.split("'")))
+        if arg.rect is not None:
+            if arg.x is not None:
+                raise ValueError("Use either x, y or --rect, not both")
+            area = util.parse_rect(arg.rect)
+        else:
+            if arg.y is None:
+                raise ValueError("Requires x and y, or option --rect")
+            map_x, map_y = util.parse_coord(arg.x), util.parse_coord(arg.y)
+            area = _radius_area(map_x, map_y, arg.radius)
 
-        map_x, map_y = util.coord_to_map(*x_parts, *y_parts)
-        chunk_x, chunk_y = util.map_to_chunk(map_x, map_y)
         map_files = [
-            os.path.join(
-                world_dir,
-                util.MAPS_DIR,
-                "{}.{}.{}".format(chunk_x, chunk_y, z),
-                "{}.{}.{}.map".format(map_x, map_y, z),
-            )
-            for z in arg.z_levels
+            file
+            for file in _area_map_files(world_dir, area, arg.z_levels)
+            if os.path.isfile(file)
         ]
 
-        collect = {}
-
-        for file in map_files:
-            if not os.path.isfile(file):
-                continue
-
-            map_json = json.read_json(file)
-            for map_chunk in map_json:
-                items = map_chunk["items"]
-                for i in range(len(items) // 3):
-                    items_here = items[i * 3 + 2]
-                    item_id = ""
-                    count = 1
-                    for item in items_here:
-                        if isinstance(item, list):
-                            item_id = item[0]["typeid"]
-                            count = item[1]
-                        else:
-                            item_id = item["typeid"]
-
-                    if item_id in collect:
-                        collect[item_id] += count
-                    else:
-                        collect[item_id] = count
+        collect = _count_items(map_files, arg.jobs)
 
         keys = list(collect.keys())
         keys.sort()
         for k in keys:
             yield "{:>4}  {}".format(collect[k], k)
+
+
+def _radius_area(map_x, map_y, radius):
+    """Area (x1, y1, x2, y2) of overmap tiles in a radius around a tile, or only the tile"""
+    if radius is None:
+        return map_x, map_y, map_x, map_y
+    if radius < 0:
+        raise ValueError("Radius must not be negative, got {}".format(radius))
+    return map_x - radius, map_y - radius, map_x + radius, map_y + radius
+
+
+def _area_map_files(world_dir, area, z_levels):
+    """Paths of the map files of all overmap tiles in an area (x1, y1, x2, y2)"""
+    for level in z_levels:
+        for map_x in range(area[0], area[2] + 1):
+            for map_y in range(area[1], area[3] + 1):
+                chunk_x, chunk_y = util.map_to_chunk(map_x, map_y)
+                yield os.path.join(
+                    world_dir,
+                    util.MAPS_DIR,
+                    "{}.{}.{}".format(chunk_x, chunk_y, level),
+                    "{}.{}.{}.map".format(map_x, map_y, level),
+                )
+
+
+def _count_items(map_files, workers):
+    """
+    Count items by id in map files.
+    With more than one worker, batches of files are read in worker processes,
+    and their partial counts are merged.
+    Map files are not kept in memory, as there may be many of them.
+    """
+    collect = collections.Counter()
+    for partial in parallel.map_batches(_count_items_batch, map_files, workers):
+        collect.update(partial)
+    return collect
+
+
+def _count_items_batch(map_files):
+    """Count items by id in a batch of map files, in a worker process if run in parallel"""
+    collect = collections.Counter()
+    for file in map_files:
+        for map_chunk in json.read_json(file):
+            for _, _, item, count in world.submap_items(map_chunk, contents=False):
+                collect[item["typeid"]] += count
+    return collect
@@ -81,7 +81,7 @@ class Note(Command):
             )
 
         world_dir = util.get_world_path(arg.dir, arg.world)
-        _, save_name, _ = util.get_save_path(world_dir, arg.player)
+        _, save_name, _ = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
         text = " ".join(arg.note)
         x_parts = list(map(int, arg.x.split("'")))
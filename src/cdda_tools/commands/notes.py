@@ -1,12 +1,11 @@
 """View and manipulate Overmap notes."""
 import argparse
 import glob
-import os
-from fnmatch import translate
 from os import path
 
 import regex
 
+from .. import globs
 from .. import json_utils as json
 from . import Command, util
 
@@ -47,7 +46,7 @@ class Notes(Command):
 
     def exec(self, arg):
         world_dir = util.get_world_path(arg.dir, arg.world)
-        _, save_name, _ = util.get_save_path(world_dir, arg.player)
+        _, save_name, _ = util.get_save_path(world_dir, arg.player, arg.cache_dir)
 
         seen_files = glob.glob(path.join(world_dir, "{}.seen.*.*".format(save_name)))
 
@@ -85,38 +84,19 @@ class Notes(Command):
             )
 
 
-def matches(text, regex_arr, case_sensitive):
-    """Test if a string marches RegEx"""
-    if not case_sensitive:
-        text = os.path.normcase(text)
-    for reg in regex_arr:
-        if regex.match(reg, text):
-            return True
-    return False
-
-
-def _compile_regex(pat, case_sensitive):
-    """Compile RegEx"""
-    if not case_sensitive:
-        pat = os.path.normcase(pat)
-
-    return regex.compile(translate(pat))
-
-
 # pylint: disable=too-many-arguments
-def _handle_notes(seen_files, patterns, ignore, case_sensitive, dry, func):
+def _handle_notes(
+    seen_files, patterns, ignore, case_sensitive, dry, func, read=json.read_json
+):
     # pylint: disable=too-many-locals
-    rex = [_compile_regex(p, case_sensitive) for p in patterns]
-    rex_ign = [_compile_regex(p, case_sensitive) for p in ignore or []]
+    matcher = globs.GlobMatcher(patterns, ignore, case_sensitive)
     for file in seen_files:
-        content = json.read_json(file)
+        content = read(file)
         notes = content["notes"]
         file_changed = False
         for note_layer in notes:
             for note in note_layer:
-                if matches(note[2], rex, case_sensitive) and not matches(
-                    note[2], rex_ign, case_sensitive
-                ):
+                if matcher(note[2]):
                     lines, file_changed = func(note)
                     for line in lines:
                         yield line
@@ -133,7 +113,15 @@ def list_notes(seen_files, patterns, ignore, danger, case_sensitive):
             lines.append(util.note_to_str(note))
         return lines, False
 
-    yield from _handle_notes(seen_files, patterns, ignore, case_sensitive, True, handle)
+    yield from _handle_notes(
+        seen_files,
+        patterns,
+        ignore,
+        case_sensitive,
+        True,
+        handle,
+        read=util.read_world_json,
+    )
 
 
 # pylint: disable=too-many-arguments
@@ -259,25 +247,19 @@ def mark_notes_danger(seen_files, patterns, ignore, radius, case_sensitive, dry)
 
 def delete_notes(seen_files, patterns, ignore, case_sensitive, dry):
     """Delete notes by pattern"""
-    rex = [_compile_regex(p, case_sensitive) for p in patterns]
-    rex_ign = [_compile_regex(p, case_sensitive) for p in ignore or []]
+    matcher = globs.GlobMatcher(patterns, ignore, case_sensitive)
     for file in seen_files:
         content = json.read_json(file)
         notes = content["notes"]
         file_changed = False
         for i, note_layer in enumerate(notes):
             for note in note_layer:
-                if matches(note[2], rex, case_sensitive) and not matches(
-                    note[2], rex_ign, case_sensitive
-                ):
+                if matcher(note[2]):
                     yield util.note_to_str(note)
             old_size = len(notes[i])
             notes[i] = list(
                 filter(
-                    lambda n: not (
-                        matches(n[2], rex, case_sensitive)
-                        and not matches(n[2], rex_ign, case_sensitive)
-                    ),
+                    lambda n: not matcher(n[2]),
                     notes[i],
                 )
             )
@@ -0,0 +1,139 @@
+"""Serve commands from a long-running process."""
+import argparse
+import json
+import os
+import socket
+import socketserver
+import tempfile
+from os import path
+
+from .. import cache
+from . import Command
+from .batch import NO_BATCH
+
+DEFAULT_SOCKET = path.join(tempfile.gettempdir(), "cdda_tools.sock")
+
+
+class ServerError(Exception):
+    """Error raised by a command executed by the server"""
+
+
+class Serve(Command):
+    """Serve commands from a long-running process."""
+
+    def add_subcommand(self, subparsers):
+        parser = subparsers.add_parser(
+            "serve",
+            help="Run a server that keeps game data and world files in memory.",
+            description="Run a server that keeps game data and world files in memory.\n\n"
+            "Other invocations with option --server are executed by the server,\n"
+            "and avoid to load and parse the same data again.\n\n"
+            "Examples:\n\n"
+            "  cdda_tools serve\n"
+            f"  cdda_tools --server {DEFAULT_SOCKET} show-data ids *wrench* --list",
+            formatter_class=argparse.RawTextHelpFormatter,
+        )
+
+        parser.add_argument(
+            "--socket",
+            "-s",
+            type=str,
+            default=DEFAULT_SOCKET,
+            help=f"Unix socket to listen on, default '{DEFAULT_SOCKET}'",
+        )
+
+    def exec(self, arg):
+        _check_unix_sockets()
+
+        if path.exists(arg.socket):
+            if _is_listening(arg.socket):
+                raise ValueError(
+                    "A server is already listening on {}".format(arg.socket)
+                )
+            os.remove(arg.socket)
+
+        yield "Listening on {}".format(arg.socket)
+
+        with cache.keep_in_memory():
+            with socketserver.UnixStreamServer(arg.socket, _RequestHandler) as server:
+                try:
+                    server.serve_forever()
+                finally:
+                    os.remove(arg.socket)
+
+
+def run_remote(arg):
+    """Execute a command by the server listening on the socket given by option --server"""
+    _check_unix_sockets()
+
+    request = dict(vars(arg))
+    request["dir"] = path.abspath(arg.dir)
+    if arg.cache_dir is not None:
+        request["cache_dir"] = path.abspath(arg.cache_dir)
+    request["server"] = None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(arg.server)
+        except OSError as err:
+            raise ValueError(
+                "Could not connect to server at {}: {}".format(arg.server, err)
+            ) from err
+
+        with sock.makefile("rw", encoding="utf-8") as stream:
+            stream.write(json.dumps(request) + "\n")
+            stream.flush()
+
+            for message in stream:
+                message = json.loads(message)
+                if "line" in message:
+                    yield message["line"]
+                elif "error" in message:
+                    raise ServerError(message["error"])
+                else:
+                    return
+
+    raise ServerError("Connection to server closed unexpectedly")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Executes a single command, sent as JSON-encoded arguments"""
+
+    def handle(self):
+        from .. import cli  # pylint: disable=import-outside-toplevel
+
+        def send(message):
+            self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            if request.get("subcommand") in NO_BATCH:
+                raise ValueError(
+                    "Command '{}' can't be run by a server".format(
+                        request.get("subcommand")
+                    )
+                )
+
+            for line in cli.run_cli(argparse.Namespace(**request)):
+                send({"line": str(line)})
+        except BrokenPipeError:
+            return
+        except Exception as err:  # pylint: disable=broad-except
+            send({"error": f"{err.__class__.__name__}: {str(err)}"})
+            return
+
+        send({"done": True})
+
+
+def _is_listening(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def _check_unix_sockets():
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError("Server mode requires Unix sockets, which are not supported")
@@ -1,13 +1,12 @@
 """Show game data."""
 import argparse
 import json
-from fnmatch import translate
 
-import regex
-
-from .. import game
+from .. import game, globs
 from . import Command, util
 
+PAIRS_INDEX_STRIDE = 1 << 32
+
 
 class ShowData(Command):
     """Show game data."""
@@ -20,6 +19,8 @@ class ShowData(Command):
             formatter_class=argparse.RawTextHelpFormatter,
         )
 
+        util.add_mods_world_option(parser)
+
         subparsers = parser.add_subparsers(
             help="Show data sub-commands",
             dest="show_subcommand",
@@ -76,7 +77,8 @@ def _add_parser_ids(subparsers):
         "Examples:\n\n"
         "  cdda_tools show-data ids wrench\n"
         "  cdda_tools show-data ids wrench --keys\n"
-        "  cdda_tools show-data ids *wrench* --list",
+        "  cdda_tools show-data ids *wrench* --list\n"
+        "  cdda_tools show-data ids *wrench* --list --stream",
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
@@ -98,6 +100,13 @@ def _add_parser_ids(subparsers):
         action="store_true",
         help="only list matches, don't print the full data",
     )
+    parser_ids.add_argument(
+        "--stream",
+        "-s",
+        action="store_true",
+        help="stream matches file by file, without loading all data into memory;\n"
+        "entries overridden by later files are not merged",
+    )
 
 
 def _add_parser_pairs(subparsers):
@@ -106,7 +115,8 @@ def _add_parser_pairs(subparsers):
         help="print data for entries with matching key/value pairs",
         description="print data for entries with matching key/value pairs\n\n"
         "Examples:\n\n"
-        "  cdda_tools show-data pairs type recipe result *pancake*",
+        "  cdda_tools show-data pairs type recipe result *pancake*\n"
+        "  cdda_tools show-data pairs type recipe result *pancake* --index",
         formatter_class=argparse.RawTextHelpFormatter,
     )
 
@@ -129,10 +139,24 @@ def _add_parser_pairs(subparsers):
         action="store_true",
         help="only list matches, don't print the full data",
     )
+    parser_pairs.add_argument(
+        "--stream",
+        "-s",
+        action="store_true",
+        help="stream matches file by file, without loading all data into memory;\n"
+        "entries overridden by later files are not merged",
+    )
+    parser_pairs.add_argument(
+        "--index",
+        "-i",
+        action="store_true",
+        help="match values via an index of distinct property values;\n"
+        "the index is stored in the cache directory, if given",
+    )
 
 
 def _hierarchical(arg):
-    data = game.read_game_data(arg.dir)
+    data = util.read_game_data(arg)
     extract = data
     search_str = "data"
 
@@ -160,40 +184,41 @@ def _search(arg):
     if arg.list and arg.keys:
         raise ValueError("Options --list and --keys are mutually exclusive.")
 
-    data = game.read_game_data(arg.dir)
+    id_matches = globs.GlobMatcher(arg.values)
+
+    prefixes = [util.glob_prefix(pat) for pat in arg.values]
+
+    if arg.stream:
+        matches = util.iter_game_data(arg, id_filter=id_matches)
+    elif all(prefixes) and util.data_index_is_kept(arg):
+        # all globs have a literal prefix, so look up id ranges in the sorted index.
+        # building the index costs more than a scan, so it is only used if it is kept
+        data = util.read_game_data(arg)
+        id_index = util.read_data_index(arg, "ids", game.IdIndex, data)
+        matches = (
+            (cat, key, data[cat][key])
+            for cat, key in id_index.lookup(prefixes, id_matches)
+        )
+    else:
+        data = util.read_game_data(arg)
+        matches = (
+            (cat, key, entry)
+            for cat, entries in data.items()
+            if isinstance(entries, dict)
+            for key, entry in entries.items()
+            if id_matches(key)
+        )
 
-    rex = [regex.compile(translate(pat)) for pat in arg.values]
     any_found = False
-    for cat, entries in data.items():
-        if isinstance(entries, dict):
-            for key, entry in entries.items():
-                match = False
-                for expr in rex:
-                    if regex.match(expr, key):
-                        match = True
-                        break
-                if match:
-                    any_found = True
-                    if arg.list:
-                        yield f"{key:50} ({cat})"
-                    elif arg.keys:
-                        yield f"----- Category {cat}: {key} -----"
-                        util.check_is_dict(entry, f"{cat} --> {key}")
-
-                        keys = list(entry.keys())
-                        keys.sort()
-                        yield keys
-                    else:
-                        yield f"----- Category {cat}: {key} -----"
-                        yield json.dumps(entry, indent=4)
+    for cat, key, entry in matches:
+        any_found = True
+        yield from _print_entry(arg, cat, key, entry)
+
     if not any_found:
         yield f"No data found for globs {arg.values}"
 
 
 def _pairs(arg):
-    # pylint: disable=too-many-locals
-    # pylint: disable=too-many-branches
-
     if arg.list and arg.keys:
         raise ValueError("Options --list and --keys are mutually exclusive.")
 
@@ -202,55 +227,135 @@ def _pairs(arg):
             "Option 'values' requires an even number of arguments (key/value pairs)."
         )
 
-    data = game.read_game_data(arg.dir)
+    if arg.stream and arg.index:
+        raise ValueError("Options --stream and --index are mutually exclusive.")
 
     conditions = [
-        (arg.values[i], regex.compile(translate(arg.values[i + 1])))
+        (arg.values[i], globs.GlobMatcher([arg.values[i + 1]]))
         for i in range(0, len(arg.values), 2)
     ]
 
+    if arg.index:
+        yield from _pairs_indexed(arg, conditions)
+        return
+
+    if arg.stream:
+        entries_all = (
+            (cat, "<unknown>" if key is None else key, entry)
+            for cat, key, entry in util.iter_game_data(arg)
+        )
+    else:
+        data = util.read_game_data(arg)
+        entries_all = (
+            (cat, key, entry)
+            for cat, entries in data.items()
+            for key, entry in (
+                entries.items()
+                if isinstance(entries, dict)
+                else [("<unknown>", e) for e in entries]
+            )
+        )
+
     any_found = False
-    for cat, entries in data.items():
-        if isinstance(entries, dict):
-            entries_temp = entries.items()
-        else:
-            entries_temp = [("<unknown>", e) for e in entries]
+    for cat, key, entry in entries_all:
+        if not isinstance(entry, dict):
+            continue
 
-        for key, entry in entries_temp:
-            if not isinstance(entry, dict):
-                continue
+        if not _entry_matches(entry, conditions):
+            continue
 
-            match = True
-            for prop_name, expr in conditions:
-                prop_match = False
-                for prop, value in entry.items():
-                    val = str(value)
-                    if prop != prop_name:
-                        continue
-                    if regex.match(expr, str(val)):
-                        prop_match = True
-                        break
-                if not prop_match:
-                    match = False
-                    break
-
-            if not match:
-                continue
+        any_found = True
+        yield from _print_entry(arg, cat, key, entry)
 
-            any_found = True
+    if not any_found:
+        yield f"No data found for pairs {arg.values}"
 
-            if arg.list:
-                yield f"{key:50} ({cat})"
-            elif arg.keys:
-                yield f"----- Category {cat}: {key} -----"
-                util.check_is_dict(entry, f"{cat} --> {key}")
 
-                keys = list(entry.keys())
-                keys.sort()
-                yield keys
-            else:
-                yield f"----- Category {cat}: {key} -----"
-                yield json.dumps(entry, indent=4)
+def _pairs_indexed(arg, conditions):
+    data = util.read_game_data(arg)
+    index = util.read_data_index(arg, "pairs", _build_pairs_index, data)
 
-    if not any_found:
+    matches = None
+    for prop_name, matcher in conditions:
+        refs = set()
+        for value, value_refs in index.get(prop_name, {}).items():
+            if matcher(value):
+                refs.update(value_refs)
+        matches = refs if matches is None else matches & refs
+        if not matches:
+            break
+
+    for cat, key, entry in _resolve_refs(data, sorted(matches)):
+        yield from _print_entry(arg, cat, key, entry)
+
+    if not matches:
         yield f"No data found for pairs {arg.values}"
+
+
+def _resolve_refs(data, refs):
+    """Iterate (category, key, entry) for pairs index references"""
+    categories = list(data.items())
+    category_entries = {}
+    for ref in refs:
+        cat_pos, entry_pos = divmod(ref, PAIRS_INDEX_STRIDE)
+        cat, entries = categories[cat_pos]
+        if cat_pos not in category_entries:
+            category_entries[cat_pos] = (
+                list(entries.items())
+                if isinstance(entries, dict)
+                else [("<unknown>", e) for e in entries]
+            )
+        key, entry = category_entries[cat_pos][entry_pos]
+        yield cat, key, entry
+
+
+def _build_pairs_index(data):
+    """
+    Index from property name to distinct stringified values to entry references.
+    References encode the positions of category and entry in the data.
+    """
+    index = {}
+    for cat_pos, entries in enumerate(data.values()):
+        if isinstance(entries, dict):
+            entries = entries.values()
+        for entry_pos, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            ref = cat_pos * PAIRS_INDEX_STRIDE + entry_pos
+            for prop, value in entry.items():
+                values = index.setdefault(prop, {})
+                val = str(value)
+                if val in values:
+                    values[val].append(ref)
+                else:
+                    values[val] = [ref]
+    return index
+
+
+def _entry_matches(entry, conditions):
+    for prop_name, matcher in conditions:
+        prop_match = False
+        for prop, value in entry.items():
+            if prop != prop_name:
+                continue
+            if matcher(str(value)):
+                prop_match = True
+                break
+        if not prop_match:
+            return False
+    return True
+
+
+def _print_entry(arg, cat, key, entry):
+    if arg.list:
+        yield f"{key:50} ({cat})"
+    elif arg.keys:
+        yield f"----- Category {cat}: {key} -----"
+        util.check_is_dict(entry, f"{cat} --> {key}")
+
+        keys = list(entry.keys())
+        keys.sort()
+        yield keys
+    else:
+        yield f"----- Category {cat}: {key} -----"
+        yield json.dumps(entry, indent=4)
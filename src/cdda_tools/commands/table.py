@@ -1,11 +1,8 @@
 """Show game data."""
 import argparse
-from fnmatch import translate
 
-import regex
-
-from .. import game
-from . import Command
+from .. import game, globs, inheritance
+from . import Command, util
 
 PATH_SEPARATOR = "/"
 
@@ -20,7 +17,8 @@ class Table(Command):
             description="Show JSON game data in tables.\n\n"
             "Examples:\n\n"
             "  cdda_tools table TOOL/rapier TOOL/sword_bayonet TOOL/sword_xiphos "
-            "--columns name/str bashing cutting piercing weight volume techniques",
+            "--columns name/str bashing cutting piercing weight volume techniques\n"
+            "  cdda_tools table TOOL/sword_* --columns weight volume --resolve",
             formatter_class=argparse.RawTextHelpFormatter,
         )
 
@@ -41,6 +39,15 @@ class Table(Command):
             help=f"columns/property paths to tabulate; path separator is '{PATH_SEPARATOR}'",
         )
 
+        util.add_mods_world_option(parser)
+
+        parser.add_argument(
+            "--resolve",
+            "-r",
+            action="store_true",
+            help="resolve copy-from inheritance, and skip abstract entries",
+        )
+
         parser.add_argument(
             "--format",
             "-f",
@@ -52,7 +59,9 @@ class Table(Command):
         # pylint: disable=too-many-locals
         # pylint: disable=too-many-branches
         # pylint: disable=too-many-nested-blocks
-        data = game.read_game_data(arg.dir)
+        # pylint: disable=too-many-statements
+        data = util.read_game_data(arg)
+        resolver = inheritance.Resolver(data) if arg.resolve else None
 
         columns = ["id"] + arg.columns
         column_paths = [col.split(PATH_SEPARATOR) for col in columns]
@@ -60,6 +69,12 @@ class Table(Command):
 
         table_data = []
 
+        id_index = None
+        if util.data_index_is_kept(arg) and any(
+            _is_prefix_glob(path.split(PATH_SEPARATOR)[-1]) for path in arg.paths
+        ):
+            id_index = util.read_data_index(arg, "ids", game.IdIndex, data)
+
         for path in arg.paths:
             path_elem = path.split(PATH_SEPARATOR)
             if len(path_elem) != 2:
@@ -73,13 +88,9 @@ class Table(Command):
             if type_cat not in data:
                 raise ValueError(f"Type '{type_cat}' not found in game data.")
 
-            reg = regex.compile(translate(id_blob))
-            entries = data[type_cat]
-
-            for key, entry in entries.items():
-                if not regex.match(reg, key):
-                    continue
-
+            for key, entry in _matching_entries(
+                data, id_index, resolver, type_cat, id_blob
+            ):
                 data_entry = {}
                 for col, col_path in zip(columns, column_paths):
                     curr_entry = entry
@@ -126,6 +137,34 @@ class Table(Command):
             )
 
 
+def _matching_entries(data, id_index, resolver, type_cat, id_blob):
+    """
+    Entries of a type with ids matching a glob pattern.
+    Plain ids are looked up directly. If an id index is given,
+    globs with a literal prefix are resolved by a range lookup in the index.
+    """
+    matcher = globs.GlobMatcher([id_blob])
+    prefix = util.glob_prefix(id_blob)
+    if prefix == id_blob:
+        keys = [id_blob] if id_blob in data[type_cat] else []
+    elif prefix and id_index is not None:
+        keys = [key for _, key in id_index.lookup([prefix], matcher, type_cat)]
+    else:
+        keys = [key for key in data[type_cat] if matcher(key)]
+
+    for key in keys:
+        if resolver is None:
+            yield key, data[type_cat][key]
+        elif not inheritance.is_abstract(data[type_cat][key]):
+            yield key, resolver.resolve(type_cat, key)
+
+
+def _is_prefix_glob(id_blob):
+    """Whether a glob has wildcards and a literal prefix"""
+    prefix = util.glob_prefix(id_blob)
+    return bool(prefix) and prefix != id_blob
+
+
 def _print_table_simple(table_data, columns, widths):
     yield " | ".join(
         [
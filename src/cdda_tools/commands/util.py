@@ -1,19 +1,28 @@
 """Utility functions for CLI commands"""
 import glob
 import math
+import mmap
 import os
 from os import path
 
+from .. import cache, game
 from .. import json_utils as json
+from .. import parallel
+from .. import world as world_data
+from ..json_utils import compression
 
 SAVE_DIR = "save"
 MAPS_DIR = "maps"
+MODS_FILE = "mods.json"
+PLAYER_NAME_PATH = ["player", "name"]
 
 OVERMAP_SIZE = 180
 MAP_SIZE = 24
 SUBMAP_SIZE = 12
 MAP_CHUNK_SIZE = 32
 
+SEARCH_CHUNK_SIZE = 1 << 20
+
 
 def add_world_option(parser, help_text):
     """Adds default --world option to a parser"""
@@ -26,6 +35,16 @@ def add_world_option(parser, help_text):
     )
 
 
+def add_mods_world_option(parser):
+    """Adds optional --world option to a parser, for loading the world's mods"""
+    parser.add_argument(
+        "--world",
+        "-w",
+        type=str,
+        help="load the mods active in this game world; default: core game data only",
+    )
+
+
 def add_world2_option(parser, help_text):
     """Adds default --world2 option to a parser"""
     parser.add_argument(
@@ -48,22 +67,38 @@ def add_vehicle_option(parser, help_text):
     )
 
 
-def add_xy_options(parser):
+def add_xy_options(parser, optional=False):
     """Adds default x y option to a parser"""
+    nargs = "?" if optional else None
     parser.add_argument(
         "x",
         type=str,
+        nargs=nargs,
         help="x coordinate in overmap format -1'179 "
         '(quote neg. numbers, with a space: " -1\'32")',
     )
     parser.add_argument(
         "y",
         type=str,
+        nargs=nargs,
         help="y coordinate in overmap format -1'179 "
         '(quote neg. numbers, with a space: " -1\'32")',
     )
 
 
+def add_rect_option(parser, help_text):
+    """Adds default --rect option for a rectangle of overmap tiles to a parser"""
+    parser.add_argument(
+        "--rect",
+        "-R",
+        type=str,
+        nargs=4,
+        metavar=("X1", "Y1", "X2", "Y2"),
+        help=help_text + ", with corners in overmap format -1'179\n"
+        '(quote neg. numbers, with a space: " -1\'32")',
+    )
+
+
 def add_z_level_options(parser):
     """Adds default z level option to a parser"""
     parser.add_argument(
@@ -85,6 +120,14 @@ def add_dry_run_options(parser):
     )
 
 
+def glob_prefix(pattern):
+    """The literal prefix of a glob pattern, before the first wildcard"""
+    for i, char in enumerate(pattern):
+        if char in "*?[":
+            return pattern[:i]
+    return pattern
+
+
 def check_is_single_vehicle_source(source_maps, name):
     """
     Checks that only a single element is passed,
@@ -125,7 +168,7 @@ def get_world_path(directory: str, world: str) -> str:
     return world_dir
 
 
-def get_save_path(world_dir: str, player: str) -> (str, str, str):
+def get_save_path(world_dir: str, player: str, cache_dir=None) -> (str, str, str):
     """Get player save location: (.sav file path, file base name, player name)"""
     sav_files = glob.glob(path.join(world_dir, "*.sav"))
     if not sav_files:
@@ -133,11 +176,7 @@ def get_save_path(world_dir: str, player: str) -> (str, str, str):
             "No saved characters found in world directory {}.".format(world_dir)
         )
 
-    players = []
-
-    for sav in sav_files:
-        character_data = json.read_json(sav)
-        players.append(character_data["player"]["name"])
+    players = get_player_names(world_dir, sav_files, cache_dir)
 
     if len(players) > 1 and player is None:
         raise ValueError(
@@ -161,30 +200,223 @@ def get_save_path(world_dir: str, player: str) -> (str, str, str):
     return sav_files[pos], save_name, player_name
 
 
+def get_player_names(world_dir, sav_files, cache_dir=None):
+    """
+    Names of the players in .sav files of a world.
+    Names are extracted without parsing entire files, and are cached
+    per world in cache_dir (if given), keyed by file size and modification time.
+    """
+    cache_path = None
+    cached = {}
+    if cache_dir is not None:
+        cache_path = cache.cache_file(cache_dir, "world_roster", world_dir)
+        cached = cache.load(cache_path) or {}
+
+    roster = {}
+    for sav in sav_files:
+        file_name = path.basename(sav)
+        stamp = cache.file_stamp(sav)
+        entry = cached.get(file_name)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, _read_player_name(sav))
+        roster[file_name] = entry
+
+    if cache_path is not None and roster != cached:
+        cache.store(cache_path, roster)
+
+    return [roster[path.basename(sav)][1] for sav in sav_files]
+
+
+def get_player_position(sav):
+    """
+    Absolute overmap tile coordinates (x, y) of the player in a .sav file.
+    Values are extracted without parsing the entire file.
+    """
+    paths = [["player", "location"]]
+    for axis in ["x", "y"]:
+        paths += [["om_" + axis], ["lev" + axis], ["player", "pos" + axis]]
+    location, *values = json.scan.read_values(sav, paths)
+    if location is not None:
+        # absolute map square coordinates
+        return location[0] // MAP_SIZE, location[1] // MAP_SIZE
+
+    position = []
+    for overmap, submap, square in zip(values[0::3], values[1::3], values[2::3]):
+        if overmap is None or submap is None or square is None:
+            raise ValueError("No player position found in {}".format(sav))
+        # absolute submap coordinates, two submaps per overmap tile
+        submap += overmap * OVERMAP_SIZE * 2 + square // SUBMAP_SIZE
+        position.append(submap // 2)
+
+    return tuple(position)
+
+
+def _read_player_name(sav):
+    name = json.scan.read_value(sav, PLAYER_NAME_PATH)
+    if name is None:
+        name = read_world_json(sav)["player"]["name"]
+    return name
+
+
+def read_game_data(arg, types=None):
+    """Read the game data, with loading options from the global command line arguments"""
+    return game.read_game_data(
+        arg.dir,
+        types,
+        cache_dir=arg.cache_dir,
+        workers=arg.jobs,
+        mods=_world_mods(arg),
+        compact=arg.compact,
+        skip_missing_mods=arg.skip_missing_mods,
+    )
+
+
+def read_data_index(arg, name, build, data):
+    """Get an index derived from game data, cached if requested by command line arguments"""
+    return game.read_data_index(
+        arg.dir,
+        name,
+        build,
+        data,
+        cache_dir=arg.cache_dir,
+        mods=_world_mods(arg),
+        skip_missing_mods=arg.skip_missing_mods,
+    )
+
+
+def data_index_is_kept(arg):
+    """
+    Whether indices derived from game data outlive a single command,
+    i.e. are stored in the cache directory or kept in memory.
+    """
+    return arg.cache_dir is not None or cache.memory() is not None
+
+
+def iter_game_data(arg, type_filter=None, id_filter=None):
+    """Iterate over game data entries, with options from the global command line arguments"""
+    return game.iter_game_data(
+        arg.dir,
+        type_filter,
+        id_filter,
+        cache_dir=arg.cache_dir,
+        mods=_world_mods(arg),
+        skip_missing_mods=arg.skip_missing_mods,
+    )
+
+
+def get_world_mods(world_dir):
+    """The mods active in a world, in loading order"""
+    mods_file = path.join(world_dir, MODS_FILE)
+    if not path.isfile(mods_file):
+        return []
+    return read_world_json(mods_file)
+
+
+def _world_mods(arg):
+    """The mods of the world given in the command line arguments, if any"""
+    world = getattr(arg, "world", None)
+    if world is None:
+        return None
+    return get_world_mods(get_world_path(arg.dir, world))
+
+
+def read_world_json(file_path):
+    """
+    Read a JSON file from a world's save directory, for read-only use.
+    While data is kept in memory (see cache.keep_in_memory), the parsed file is
+    re-used until the file changes, so the result must not be modified.
+    """
+    memory = cache.memory()
+    if memory is None:
+        return json.read_json(file_path)
+    return memory.get(
+        ("world_json", path.abspath(file_path)),
+        cache.file_stamp(file_path),
+        lambda: json.read_json(file_path),
+    )
+
+
 def file_contains(file_path: str, text: str) -> bool:
-    """Tests is a file's content contains given text"""
-    with open(file_path, "r", encoding="utf-8") as file:
-        content = file.read()
-        cont = text in content
-    return cont
+    """
+    Tests is a file's content contains given text.
+    Uncompressed files are searched as raw bytes via mmap. Compressed files
+    are decompressed while reading, in chunks of constant size.
+    """
+    needle = text.encode("utf-8")
+    with open(file_path, "rb") as file:
+        if compression.detect(file.read(compression.MAGIC_LENGTH)) is None:
+            if os.fstat(file.fileno()).st_size == 0:
+                return len(needle) == 0
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped.find(needle) >= 0
+
+    return _stream_contains(file_path, needle)
+
+
+def _stream_contains(file_path, needle):
+    overlap = max(len(needle) - 1, 0)
+    with compression.open_file(file_path) as file:
+        tail = b""
+        while True:
+            chunk = file.read(SEARCH_CHUNK_SIZE)
+            if len(chunk) == 0:
+                return len(needle) == 0
+            block = tail + chunk
+            if needle in block:
+                return True
+            tail = block[len(block) - overlap :]
 
 
 def read_file(file_path: str) -> str:
-    """Read a text file"""
-    with open(file_path, "r", encoding="utf-8") as file:
-        content = file.read()
-    return content
+    """Read a text file, decompressed if compressed"""
+    content, _ = compression.read_file(file_path)
+    return content.decode("utf-8")
 
 
-def find_files_with_text(dir_path, text):
-    """Collects all files with content containing text, recursively."""
-    files = []
-    for map_dir in os.walk(dir_path):
-        for map_file in map_dir[2]:
-            file_path = path.join(map_dir[0], map_file)
-            if file_contains(file_path, text):
-                files.append(file_path)
-    return files
+def find_vehicle_files(world_dir, name, cache_dir=None, workers=1):
+    """
+    Map files of a world that contain a vehicle name.
+    With a cache directory, the world's vehicle index is used instead of searching all files.
+    Without, the search stops after two files, as the name is not unique then.
+    """
+    maps_dir = path.join(world_dir, MAPS_DIR)
+    if cache_dir is None:
+        return find_files_with_text(maps_dir, name, max_hits=2, workers=workers)
+
+    vehicles = world_data.read_vehicle_index(maps_dir, cache_dir).get(name, [])
+    return sorted({file for file, _ in vehicles})
+
+
+def find_files_with_text(dir_path, text, max_hits=None, workers=1):
+    """
+    Collects all files with content containing text, recursively.
+    Stops after max_hits files, if given. With more than one worker,
+    batches of files are searched in worker processes.
+    """
+    files = [
+        path.join(map_dir[0], map_file)
+        for map_dir in os.walk(dir_path)
+        for map_file in map_dir[2]
+    ]
+    hits = []
+    for batch_hits in parallel.map_batches(
+        _files_containing, files, workers, text, max_hits
+    ):
+        hits.extend(batch_hits)
+        if max_hits is not None and len(hits) >= max_hits:
+            return hits[:max_hits]
+    return hits
+
+
+def _files_containing(files, text, max_hits):
+    """Files containing text, stopping after max_hits. Runs in worker processes."""
+    hits = []
+    for file in files:
+        if file_contains(file, text):
+            hits.append(file)
+            if max_hits is not None and len(hits) >= max_hits:
+                break
+    return hits
 
 
 def index_to_xy_overmap(idx):
@@ -194,6 +426,22 @@ def index_to_xy_overmap(idx):
     return x_coord, y_coord
 
 
+def parse_coord(text):
+    """Parses a coordinate in overmap format -1'179 (or a plain number) to absolute overmap tiles"""
+    parts = list(map(int, text.split("'")))
+    if len(parts) == 1:
+        return parts[0]
+    if len(parts) != 2:
+        raise ValueError("Invalid coordinate '{}', expected format -1'179".format(text))
+    return OVERMAP_SIZE * parts[0] + parts[1]
+
+
+def parse_rect(corners):
+    """Parses rectangle corners in overmap format to absolute overmap tiles (x1, y1, x2, y2)"""
+    x_1, y_1, x_2, y_2 = map(parse_coord, corners)
+    return min(x_1, x_2), min(y_1, y_2), max(x_1, x_2), max(y_1, y_2)
+
+
 def coord_to_map(x_major, x_minor, y_major, y_minor):
     """Converts overmap coords of format (1'123, -1'50) to absolute overmap tile coords"""
     return OVERMAP_SIZE * x_major + x_minor, OVERMAP_SIZE * y_major + y_minor
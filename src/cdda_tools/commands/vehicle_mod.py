@@ -1,9 +1,7 @@
 """Create a mod file from an in-game vehicle."""
 import argparse
 import json
-from os import path
 
-from .. import json_utils
 from . import Command, util
 
 TANKS = {"tank", "tank_medium", "tank_small", "external_tank"}
@@ -46,13 +44,14 @@ class VehicleMod(Command):
 
     def exec(self, arg):
         world_dir = util.get_world_path(arg.dir, arg.world)
-        source_path = path.join(world_dir, util.MAPS_DIR)
-        source_maps = util.find_files_with_text(source_path, arg.vehicle)
+        source_maps = util.find_vehicle_files(
+            world_dir, arg.vehicle, arg.cache_dir, arg.jobs
+        )
 
         util.check_is_single_vehicle_source(source_maps, arg.vehicle)
 
         source_map = source_maps[0]
-        sources = json_utils.read_json(source_map)
+        sources = util.read_world_json(source_map)
         source_vehicle = None
 
         for source in sources:
@@ -0,0 +1,127 @@
+"""Compact, immutable in-memory representation of game data"""
+import sys
+
+
+def _immutable(self, *_args, **_kwargs):
+    raise TypeError("'{}' object is immutable".format(type(self).__name__))
+
+
+class FrozenDict(dict):
+    """Immutable dictionary without per-instance overhead beyond a dict"""
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    """Immutable list without per-instance overhead beyond a list"""
+
+    __slots__ = ()
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable
+    __imul__ = _immutable
+    append = _immutable
+    clear = _immutable
+    extend = _immutable
+    insert = _immutable
+    pop = _immutable
+    remove = _immutable
+    reverse = _immutable
+    sort = _immutable
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def compact_data(data):
+    """
+    Convert game data to a compact representation.
+
+    Strings are interned, entries and all their sub-objects are frozen,
+    and identical sub-objects are shared between entries.
+    The top-level dictionary and the per-type containers stay mutable.
+    """
+    compactor = Compactor()
+    # the same entry, stored under multiple ids, is converted only once.
+    # entries are kept alive by the data, so their ids are not re-used
+    converted = {}
+
+    def compact_entry(entry):
+        if id(entry) not in converted:
+            converted[id(entry)] = compactor.compact(entry)
+        return converted[id(entry)]
+
+    result = {}
+    for entry_type, entries in data.items():
+        entry_type = sys.intern(entry_type)
+        if isinstance(entries, dict):
+            result[entry_type] = {
+                compactor.compact(key): compact_entry(entry)
+                for key, entry in entries.items()
+            }
+        else:
+            result[entry_type] = [compact_entry(entry) for entry in entries]
+    return result
+
+
+class Compactor:
+    """
+    Converts JSON values to frozen, shared values, memoized by content.
+
+    Values can be compacted one after another, e.g. file by file while loading,
+    sharing identical sub-objects across all of them. Compacted values do not
+    reference the originals, so each original can be dropped after conversion.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self._shared = {}
+
+    def compact(self, value):
+        """Compact representation of a JSON value"""
+        if isinstance(value, str):
+            return sys.intern(value)
+
+        if not isinstance(value, (dict, list)):
+            return self._shared.setdefault(_share_key(value), value)
+
+        if isinstance(value, dict):
+            items = [(self.compact(k), self.compact(v)) for k, v in value.items()]
+            key = (FrozenDict, *(part for k, v in items for part in (k, _share_key(v))))
+            result = self._shared.get(key)
+            if result is None:
+                result = self._shared[key] = FrozenDict(items)
+        else:
+            items = [self.compact(v) for v in value]
+            key = (FrozenList, *(_share_key(v) for v in items))
+            result = self._shared.get(key)
+            if result is None:
+                result = self._shared[key] = FrozenList(items)
+
+        return result
+
+
+def _share_key(value):
+    """Key for sharing a value that was already compacted"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return id(value)
+    if isinstance(value, float):
+        # distinguishes -0.0 from 0.0, which compare equal
+        return float, repr(value)
+    return type(value), value
@@ -1,53 +1,499 @@
 """CDDA game data"""
+import bisect
 import glob
+import hashlib
 from os import path
 
-from . import json_utils
+from . import cache, json_utils, parallel
+from .compact import Compactor
 
 DATA_DIR = "data"
 JSON_DIR = "json"
+MODS_DIR = "mods"
+MOD_INFO_FILE = "modinfo.json"
+CORE_MOD = "dda"
 
 
-def read_game_data(game_dir, types=None):
-    """Read all CDDA json into a large nested dictionary"""
-    # pylint: disable=too-many-branches
-
-    json_glob = path.join(game_dir, DATA_DIR, JSON_DIR, "**", "*.json")
+# pylint: disable=too-many-arguments
+def read_game_data(
+    game_dir,
+    types=None,
+    cache_dir=None,
+    workers=1,
+    mods=None,
+    compact=False,
+    skip_missing_mods=False,
+):
+    """
+    Read all CDDA json into a large nested dictionary.
 
+    Mods are loaded as layers on top of the core data, in the given order,
+    with entries of later layers overriding entries with the same id.
+    Raises a ValueError if a mod is not installed, unless skip_missing_mods is set.
+    If a cache directory is given, the parsed data is cached there,
+    and only files that changed since the last run are parsed again.
+    Further, an index of the types contained in each file is maintained there,
+    so that reading only some types parses only the files containing them.
+    Each layer is cached separately.
+    With more than one worker, files are parsed in a pool of processes.
+    In compact mode, entries are frozen and share strings and identical sub-objects
+    (see compact.compact_data). Files are compacted one by one while loading,
+    and the compacted form is cached.
+    While data is kept in memory (see cache.keep_in_memory),
+    it is only read again if any file changed.
+    """
     if types is not None:
-        types = set(types)
+        types = frozenset(types)
+
+    layers = layer_dirs(game_dir, mods, skip_missing_mods)
+
+    memory = cache.memory()
+    if memory is not None:
+        key = ("game_data", tuple(map(path.abspath, layers)), types, compact)
+        return memory.get(
+            key,
+            _data_stamp(layers),
+            lambda: _read_layers(layers, types, cache_dir, workers, compact),
+        )
+
+    return _read_layers(layers, types, cache_dir, workers, compact)
+
+
+def _read_layers(layers, types, cache_dir, workers, compact):
+    """Read and merge data layers"""
+    if len(layers) == 1:
+        return _read_layer(layers[0], types, cache_dir, workers, compact)
+
+    data = GameData()
+    for layer_dir in layers:
+        _overlay(data, _read_layer(layer_dir, types, cache_dir, workers, compact))
+    return data
+
+
+class GameData(dict):
+    """
+    Game data merged from multiple layers.
+
+    Entries overridden by a later layer with a copy-from of their own id
+    are kept in overridden, by type and id, in loading order,
+    so that inheritance can be resolved against them.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.overridden = {}
 
+
+def layer_dirs(game_dir, mods=None, skip_missing=False):
+    """
+    Data directories of the core game and the given mods, in loading order.
+    Raises a ValueError if a mod is not installed, unless skip_missing is set.
+    """
+    layers = [path.join(game_dir, DATA_DIR, JSON_DIR)]
+    if not mods:
+        return layers
+
+    mod_dirs = find_mods(game_dir)
+    for mod in mods:
+        if mod == CORE_MOD:
+            continue
+        if mod not in mod_dirs:
+            if skip_missing:
+                continue
+            raise ValueError(
+                "Mod '{}' not found in {} or {}. "
+                "Use option --skip-missing-mods to skip it.".format(
+                    mod,
+                    path.join(game_dir, DATA_DIR, MODS_DIR),
+                    path.join(game_dir, MODS_DIR),
+                )
+            )
+        layers.append(mod_dirs[mod])
+
+    return layers
+
+
+def find_mods(game_dir):
+    """
+    Find all mods in the game's data directory and in the user mods directory.
+    Returns a dict of mod id to directory. Mods in the data directory take precedence.
+    """
+    mod_dirs = {}
+    for mods_dir in [
+        path.join(game_dir, MODS_DIR),
+        path.join(game_dir, DATA_DIR, MODS_DIR),
+    ]:
+        info_glob = path.join(mods_dir, "**", MOD_INFO_FILE)
+        for info_file in sorted(glob.glob(info_glob, recursive=True)):
+            for entry in json_utils.read_json(info_file):
+                if entry.get("type") == "MOD_INFO":
+                    mod_dir = path.dirname(info_file)
+                    if "path" in entry:
+                        mod_dir = path.join(mod_dir, entry["path"])
+                    mod_dirs[entry["id"]] = mod_dir
+    return mod_dirs
+
+
+# pylint: disable=too-many-arguments
+def _read_layer(json_dir, types, cache_dir, workers, compact):
+    """Read the data of a single layer, i.e. the core game or a mod"""
+    if cache_dir is not None:
+        if types is None:
+            return _read_cached(json_dir, cache_dir, workers, compact)
+        return _read_indexed(json_dir, cache_dir, types, workers, compact)
+
+    compactor = Compactor() if compact else None
     data = {}
+    for entries in _parse_files(_json_files(json_dir), workers, types):
+        _add_entries(data, _compact_entries(entries, compactor))
+
+    return data
+
 
-    for file in glob.iglob(json_glob, recursive=True):
-        json_data = json_utils.read_json(file)
-        for entry in json_data:
+def _overlay(data, layer):
+    """Merge a data layer into the data, without modifying the layer"""
+    for entry_type, entries in layer.items():
+        current = data.get(entry_type)
+        if isinstance(current, dict) and isinstance(entries, dict):
+            overridden = data.overridden.setdefault(entry_type, {})
+            for entry_id, entry in entries.items():
+                if entry_id not in current:
+                    continue
+                if entry.get("copy-from") == entry_id:
+                    overridden.setdefault(entry_id, []).append(current[entry_id])
+                else:
+                    overridden.pop(entry_id, None)
+            if not overridden:
+                del data.overridden[entry_type]
+            current.update(entries)
+        elif isinstance(current, list) and isinstance(entries, list):
+            current.extend(entries)
+        elif isinstance(entries, dict):
+            data[entry_type] = dict(entries)
+        else:
+            data[entry_type] = list(entries)
+
+
+class IdIndex:
+    """
+    Sorted index of all ids in the game data, for fast lookup of ids by prefix.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, data):
+        self.categories = list(data.keys())
+        keys = []
+        for cat_pos, entries in enumerate(data.values()):
+            if isinstance(entries, dict):
+                for entry_pos, key in enumerate(entries):
+                    keys.append((key, cat_pos, entry_pos))
+        keys.sort()
+
+        self.ids = [key for key, _, _ in keys]
+        self.refs = [(cat_pos, entry_pos) for _, cat_pos, entry_pos in keys]
+
+    def lookup(self, prefixes, predicate, category=None):
+        """
+        (category, id) pairs of all ids that start with any of the prefixes
+        and match the predicate, in data order.
+        """
+        found = set()
+        for prefix in prefixes:
+            for i in range(bisect.bisect_left(self.ids, prefix), len(self.ids)):
+                key = self.ids[i]
+                if not key.startswith(prefix):
+                    break
+                cat_pos, entry_pos = self.refs[i]
+                if category is not None and self.categories[cat_pos] != category:
+                    continue
+                if predicate(key):
+                    found.add((cat_pos, entry_pos, key))
+
+        return [(self.categories[cat_pos], key) for cat_pos, _, key in sorted(found)]
+
+
+# pylint: disable=too-many-arguments
+def iter_game_data(
+    game_dir,
+    type_filter=None,
+    id_filter=None,
+    cache_dir=None,
+    mods=None,
+    skip_missing_mods=False,
+):
+    """
+    Iterate over all CDDA json entries as (type, id, entry) tuples, file by file.
+
+    Only a single file is held in memory at a time.
+    Entries without an id are yielded with id None, except if an id filter is given.
+    Both filters are predicates on the type or id string.
+    If a cache directory with a type index is given,
+    files without any entries of accepted types are not parsed.
+    Entries overridden by later files or mods are not merged, but yielded again.
+    """
+    for json_dir in layer_dirs(game_dir, mods, skip_missing_mods):
+        yield from _iter_layer(json_dir, type_filter, id_filter, cache_dir)
+
+
+def _iter_layer(json_dir, type_filter, id_filter, cache_dir):
+    """Iterate over the entries of a single layer, i.e. the core game or a mod"""
+    type_index = {}
+    if cache_dir is not None and type_filter is not None:
+        type_index = (
+            cache.load(cache.cache_file(cache_dir, "game_types", json_dir)) or {}
+        )
+
+    for file in _json_files(json_dir):
+        cached_file = type_index.get(path.relpath(file, json_dir))
+        if (
+            cached_file is not None
+            and cached_file[0] == cache.file_stamp(file)
+            and not any(type_filter(entry_type) for entry_type in cached_file[1])
+        ):
+            continue
+
+        for entry in json_utils.read_json(file):
             entry_type = entry["type"]
-            if types is not None and entry_type not in types:
+            if type_filter is not None and not type_filter(entry_type):
                 continue
-            if "id" in entry:
-                entry_ids = entry["id"]
-                if not isinstance(entry_ids, list):
-                    entry_ids = [entry_ids]
-                for entry_id in entry_ids:
-                    if entry_type in data:
-                        data[entry_type][entry_id] = entry
-                    else:
-                        data[entry_type] = {entry_id: entry}
-            elif (
-                "abstract" in entry
-                and entry_type != "recipe"
-                and entry_type != "uncraft"
-            ):
-                entry_id = entry["abstract"]
+
+            entry_ids = _entry_ids(entry)
+            if entry_ids is None:
+                if id_filter is None:
+                    yield entry_type, None, entry
+                continue
+
+            for entry_id in entry_ids:
+                if id_filter is None or id_filter(entry_id):
+                    yield entry_type, entry_id, entry
+
+
+# pylint: disable=too-many-arguments
+def read_data_index(
+    game_dir, name, build, data, cache_dir=None, mods=None, skip_missing_mods=False
+):
+    """
+    Get an index derived from the game data, built by calling build(data).
+
+    If a cache directory is given, the index is stored there along with the game data,
+    and is only rebuilt if any data file changed since it was built.
+    While data is kept in memory (see cache.keep_in_memory), the index is kept as well.
+    """
+    layers = layer_dirs(game_dir, mods, skip_missing_mods)
+
+    memory = cache.memory()
+    if memory is not None:
+        key = ("game_index", name, tuple(map(path.abspath, layers)))
+        return memory.get(
+            key,
+            _data_stamp(layers),
+            lambda: _read_data_index(layers, name, build, data, cache_dir),
+        )
+
+    return _read_data_index(layers, name, build, data, cache_dir)
+
+
+def _read_data_index(layers, name, build, data, cache_dir):
+    """Read an index derived from the game data from the cache, or build it"""
+    if cache_dir is None:
+        return build(data)
+
+    cache_path = cache.cache_file(cache_dir, "game_index_" + name, layers)
+    stamp = _data_stamp(layers)
+
+    cached = cache.load(cache_path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    index = build(data)
+    cache.store(cache_path, (stamp, index))
+    return index
+
+
+def _data_stamp(layers):
+    """A digest over paths, sizes and modification times of all files in data directories"""
+    digest = hashlib.sha1()
+    for json_dir in layers:
+        for file in _json_files(json_dir):
+            digest.update(repr((file, cache.file_stamp(file))).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _json_files(json_dir):
+    """All JSON files in a data directory, in deterministic order"""
+    return sorted(glob.glob(path.join(json_dir, "**", "*.json"), recursive=True))
+
+
+def _parse_files(files, workers, types=None):
+    """
+    Parse JSON files, yielding their entries of the given types in file order.
+
+    With more than one worker, batches of files are parsed in worker processes.
+    Results are still yielded in file order, so that later files override
+    earlier ones exactly like in serial parsing.
+    Serially, files are parsed one at a time, so that only one is held unprocessed.
+    """
+    if workers <= 1:
+        for file in files:
+            yield _filter_entries(json_utils.read_json(file), types)
+        return
+
+    for batch in parallel.map_batches(_parse_batch, files, workers, types):
+        yield from batch
+
+
+def _parse_batch(files, types):
+    """Parse a batch of JSON files, in a worker process if parsing in parallel"""
+    return [_filter_entries(json_utils.read_json(file), types) for file in files]
+
+
+def _compact_entries(entries, compactor):
+    """Compact the entries of a JSON file, if a compactor is given"""
+    if compactor is None:
+        return entries
+    return [compactor.compact(entry) for entry in entries]
+
+
+def _filter_entries(entries, types):
+    """Restrict the entries of a JSON file to the given types"""
+    if types is None:
+        return entries
+    return [entry for entry in entries if entry["type"] in types]
+
+
+def _read_cached(json_dir, cache_dir, workers, compact):
+    """
+    Read a data directory, re-using parsed files from the cache where unchanged.
+    Compacted data is cached separately, so that it is not compacted on every load.
+    """
+    # pylint: disable=too-many-locals
+    kind = "game_data_compact" if compact else "game_data"
+    cache_path = cache.cache_file(cache_dir, kind, json_dir)
+    cached = cache.load(cache_path) or {"files": {}, "data": None}
+    cached_files = cached["files"]
+
+    files = {}
+    changed_files = []
+    for file in _json_files(json_dir):
+        rel_path = path.relpath(file, json_dir)
+        stamp = cache.file_stamp(file)
+        cached_file = cached_files.get(rel_path)
+        if cached_file is not None and cached_file[0] == stamp:
+            files[rel_path] = cached_file
+        else:
+            files[rel_path] = (stamp, None)
+            changed_files.append(file)
+
+    compactor = Compactor() if compact else None
+    for file, entries in zip(changed_files, _parse_files(changed_files, workers)):
+        rel_path = path.relpath(file, json_dir)
+        files[rel_path] = (files[rel_path][0], _compact_entries(entries, compactor))
+
+    if (
+        not changed_files
+        and cached["data"] is not None
+        and len(files) == len(cached_files)
+    ):
+        return cached["data"]
+
+    data = {}
+    for _, entries in files.values():
+        _add_entries(data, entries)
+
+    # entries are shared between files and data, so pickle stores them only once
+    cache.store(cache_path, {"files": files, "data": data})
+
+    type_index = {
+        rel_path: (stamp, _entry_types(entries))
+        for rel_path, (stamp, entries) in files.items()
+    }
+    cache.store(cache.cache_file(cache_dir, "game_types", json_dir), type_index)
+
+    return data
+
+
+def _read_indexed(json_dir, cache_dir, types, workers, compact):
+    """Read entries of the given types, parsing only files that contain them"""
+    # pylint: disable=too-many-locals
+    index_path = cache.cache_file(cache_dir, "game_types", json_dir)
+    cached_index = cache.load(index_path) or {}
+
+    files = []
+    type_index = {}
+    changed_files = []
+    for file in _json_files(json_dir):
+        rel_path = path.relpath(file, json_dir)
+        stamp = cache.file_stamp(file)
+        files.append((file, rel_path))
+        cached_file = cached_index.get(rel_path)
+        if cached_file is not None and cached_file[0] == stamp:
+            type_index[rel_path] = cached_file
+        else:
+            type_index[rel_path] = (stamp, None)
+            changed_files.append(file)
+
+    compactor = Compactor() if compact else None
+    fragments = {}
+    for file, entries in zip(changed_files, _parse_files(changed_files, workers)):
+        rel_path = path.relpath(file, json_dir)
+        type_index[rel_path] = (type_index[rel_path][0], _entry_types(entries))
+        fragments[rel_path] = _compact_entries(
+            _filter_entries(entries, types), compactor
+        )
+
+    if changed_files or len(type_index) != len(cached_index):
+        cache.store(index_path, type_index)
+
+    relevant = [
+        (file, rel_path)
+        for file, rel_path in files
+        if rel_path not in fragments and not type_index[rel_path][1].isdisjoint(types)
+    ]
+    relevant_files = [file for file, _ in relevant]
+    for (_, rel_path), entries in zip(
+        relevant, _parse_files(relevant_files, workers, types)
+    ):
+        fragments[rel_path] = _compact_entries(entries, compactor)
+
+    data = {}
+    for _, rel_path in files:
+        if rel_path in fragments:
+            _add_entries(data, fragments[rel_path])
+
+    return data
+
+
+def _entry_types(entries):
+    """The set of types of the entries of a JSON file"""
+    return frozenset(entry["type"] for entry in entries)
+
+
+def _add_entries(data, entries):
+    """Add the entries of a JSON file to the data dictionary"""
+    for entry in entries:
+        entry_type = entry["type"]
+        entry_ids = _entry_ids(entry)
+        if entry_ids is not None:
+            for entry_id in entry_ids:
                 if entry_type in data:
                     data[entry_type][entry_id] = entry
                 else:
                     data[entry_type] = {entry_id: entry}
+        else:
+            if entry_type in data:
+                data[entry_type].append(entry)
             else:
-                if entry_type in data:
-                    data[entry_type].append(entry)
-                else:
-                    data[entry_type] = [entry]
+                data[entry_type] = [entry]
 
-    return data
+
+def _entry_ids(entry):
+    """The ids an entry is stored under, or None for entries without id"""
+    if "id" in entry:
+        entry_ids = entry["id"]
+        if not isinstance(entry_ids, list):
+            entry_ids = [entry_ids]
+        return entry_ids
+    if "abstract" in entry and entry["type"] != "recipe" and entry["type"] != "uncraft":
+        return [entry["abstract"]]
+    return None
@@ -0,0 +1,47 @@
+"""Matching of strings against sets of glob patterns"""
+import functools
+from fnmatch import translate
+
+import regex
+
+CACHE_SIZE = 65536
+
+
+class GlobMatcher:
+    """
+    Matches strings against include and ignore glob patterns.
+
+    Each pattern set is compiled into a single alternation, and results are
+    memoized per distinct string in a bounded LRU cache.
+    Case-insensitive matching folds patterns and strings to lower case.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(
+        self, patterns, ignore=None, case_sensitive=True, cache_size=CACHE_SIZE
+    ):
+        self.case_sensitive = case_sensitive
+        self._include = self._compile(patterns)
+        self._ignore = self._compile(ignore or [])
+        self._matches = functools.lru_cache(maxsize=cache_size)(self._match)
+
+    def __call__(self, text):
+        """Whether a string matches any include pattern and no ignore pattern"""
+        return self._matches(text)
+
+    def _compile(self, patterns):
+        if not self.case_sensitive:
+            patterns = [pat.casefold() for pat in patterns]
+        if len(patterns) == 0:
+            return None
+        return regex.compile("|".join(f"(?:{translate(pat)})" for pat in patterns))
+
+    def _match(self, text):
+        if self._include is None:
+            return False
+        if not self.case_sensitive:
+            text = text.casefold()
+        return self._include.match(text) is not None and (
+            self._ignore is None or self._ignore.match(text) is None
+        )
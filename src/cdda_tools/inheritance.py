@@ -0,0 +1,248 @@
+"""Resolution of copy-from inheritance in CDDA game data"""
+import regex
+
+ITEM_TYPES = {
+    "AMMO",
+    "ARMOR",
+    "BATTERY",
+    "BIONIC_ITEM",
+    "BOOK",
+    "COMESTIBLE",
+    "ENGINE",
+    "GENERIC",
+    "GUN",
+    "GUNMOD",
+    "ITEM",
+    "MAGAZINE",
+    "PET_ARMOR",
+    "TOOL",
+    "TOOLMOD",
+    "TOOL_ARMOR",
+    "WHEEL",
+}
+
+INHERITANCE_KEYS = (
+    "copy-from",
+    "abstract",
+    "extend",
+    "delete",
+    "relative",
+    "proportional",
+)
+
+UNITS = [
+    {"mg": 1, "g": 1000, "kg": 1000000},
+    {"ml": 1, "L": 1000},
+    {"mm": 1, "cm": 10, "m": 1000, "km": 1000000},
+    {"mJ": 1, "J": 1000, "kJ": 1000000},
+    {"s": 1, "turns": 1, "m": 60, "h": 3600, "d": 86400},
+]
+
+QUANTITY = regex.compile(r"\s*(-?[0-9]+(?:\.[0-9]+)?)\s*([a-zA-Z]+)")
+
+
+class Resolver:
+    """
+    Resolves copy-from inheritance of game data entries
+    (copy-from, extend, delete, relative, proportional).
+
+    Resolved entries, including all ancestors, are memoized.
+    Resolving all entries is thus linear in the number of entries,
+    independent of inheritance depth.
+    Returned entries are shared with the memo and must not be modified.
+
+    Entries with a copy-from of their own id, typically from mods,
+    inherit from the entry they override (see game.GameData).
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._overridden = getattr(data, "overridden", {})
+        self._resolved = {}
+        self._resolving = set()
+
+    def resolve(self, entry_type, entry_id):
+        """The fully resolved entry for a type and id"""
+        return self._resolve(
+            entry_type, entry_id, self._top_layer(entry_type, entry_id)
+        )
+
+    def _resolve(self, entry_type, entry_id, layer):
+        """The resolved entry for a type and id, in the given layer of overrides"""
+        key = (entry_type, entry_id, layer)
+        if key in self._resolved:
+            return self._resolved[key]
+
+        if key in self._resolving:
+            raise ValueError(
+                f"Circular copy-from inheritance for '{entry_id}' ({entry_type})"
+            )
+
+        entry = self._entry(entry_type, entry_id, layer)
+        if "copy-from" not in entry:
+            resolved = entry
+        else:
+            self._resolving.add(key)
+            try:
+                parent = self._resolve(
+                    *self._find_parent(entry_type, entry_id, entry, layer)
+                )
+            finally:
+                self._resolving.discard(key)
+            resolved = inherit(parent, entry)
+
+        self._resolved[key] = resolved
+        return resolved
+
+    def entries(self, entry_type):
+        """Iterate over (id, resolved entry) for all non-abstract entries of a type"""
+        for entry_id, entry in self.data[entry_type].items():
+            if is_abstract(entry):
+                continue
+            yield entry_id, self.resolve(entry_type, entry_id)
+
+    def _top_layer(self, entry_type, entry_id):
+        """The layer of the current entry for a type and id, above all overridden ones"""
+        return len(self._overridden.get(entry_type, {}).get(entry_id, ()))
+
+    def _entry(self, entry_type, entry_id, layer):
+        overridden = self._overridden.get(entry_type, {}).get(entry_id, ())
+        if layer < len(overridden):
+            return overridden[layer]
+        return self.data[entry_type][entry_id]
+
+    def _find_parent(self, entry_type, entry_id, entry, layer):
+        parent_id = entry["copy-from"]
+        if parent_id == entry_id and layer > 0:
+            return entry_type, parent_id, layer - 1
+
+        if parent_id in self.data.get(entry_type, {}):
+            return entry_type, parent_id, self._top_layer(entry_type, parent_id)
+
+        if entry_type in ITEM_TYPES:
+            for item_type in ITEM_TYPES:
+                if parent_id in self.data.get(item_type, {}):
+                    return item_type, parent_id, self._top_layer(item_type, parent_id)
+
+        raise ValueError(
+            f"Copy-from parent '{parent_id}' of '{entry.get('id', entry.get('abstract'))}' "
+            f"({entry_type}) not found"
+        )
+
+
+def is_abstract(entry):
+    """Whether an entry is abstract, i.e. only serves as copy-from parent"""
+    return "abstract" in entry and "id" not in entry
+
+
+def inherit(parent, entry):
+    """Apply an entry with copy-from on top of its (resolved) parent"""
+    result = {
+        key: value for key, value in parent.items() if key not in INHERITANCE_KEYS
+    }
+    for key, value in entry.items():
+        if key not in INHERITANCE_KEYS or key == "abstract":
+            result[key] = value
+
+    if "id" in entry:
+        result.pop("abstract", None)
+
+    for key, value in entry.get("relative", {}).items():
+        result[key] = _relative(result.get(key), value)
+    for key, value in entry.get("proportional", {}).items():
+        if key in result:
+            result[key] = _proportional(result[key], value)
+    for key, value in entry.get("extend", {}).items():
+        result[key] = _as_list(result.get(key, [])) + _as_list(value)
+    for key, value in entry.get("delete", {}).items():
+        delete = _as_list(value)
+        if key in result:
+            result[key] = [v for v in _as_list(result[key]) if v not in delete]
+
+    return result
+
+
+def _relative(value, change):
+    if isinstance(change, dict):
+        value = dict(value) if isinstance(value, dict) else {}
+        for key, sub_change in change.items():
+            value[key] = _relative(value.get(key), sub_change)
+        return value
+    if value is None:
+        return change
+    if _is_number(value) and _is_number(change):
+        return value + change
+    if isinstance(value, str) and isinstance(change, str):
+        return _add_quantities(value, change) or value
+    return value
+
+
+def _proportional(value, factor):
+    if isinstance(factor, dict):
+        if not isinstance(value, dict):
+            return value
+        value = dict(value)
+        for key, sub_factor in factor.items():
+            if key in value:
+                value[key] = _proportional(value[key], sub_factor)
+        return value
+    if not _is_number(factor):
+        return value
+    if _is_number(value):
+        result = value * factor
+        return int(result) if isinstance(value, int) else result
+    if isinstance(value, str):
+        quantity = _parse_quantity(value)
+        if quantity is not None:
+            return _format_quantity(quantity[0] * factor, quantity[1])
+    return value
+
+
+def _add_quantities(value, change):
+    quantity = _parse_quantity(value)
+    if quantity is None:
+        return None
+    change_quantity = _parse_quantity(change, quantity[1])
+    if change_quantity is None or quantity[1] is not change_quantity[1]:
+        return None
+    return _format_quantity(quantity[0] + change_quantity[0], quantity[1])
+
+
+def _parse_quantity(text, preferred_units=None):
+    """Parse a quantity with units, like '1 L 250 ml', to (value in base unit, units)"""
+    candidates = UNITS if preferred_units is None else [preferred_units] + UNITS
+    total = 0
+    units = None
+    pos = 0
+    while pos < len(text.rstrip()):
+        match = QUANTITY.match(text, pos)
+        if match is None:
+            return None
+        pos = match.end()
+        for unit_set in candidates if units is None else [units]:
+            if match.group(2) in unit_set:
+                units = unit_set
+                total += float(match.group(1)) * unit_set[match.group(2)]
+                break
+        else:
+            return None
+    if units is None:
+        return None
+    return total, units
+
+
+def _format_quantity(value, units):
+    """Format a quantity in the largest unit that gives an integer"""
+    value = round(value)
+    for name, factor in sorted(units.items(), key=lambda unit: -unit[1]):
+        if value % factor == 0:
+            return f"{value // factor} {name}"
+    return f"{value} {min(units, key=units.get)}"
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
@@ -1,23 +1,117 @@
 """
 JSON file handling.
 """
-import json
+import os
+import stat
+import tempfile
+
+from . import compression, scan
+from .backend import BACKENDS, get_backend, set_backend
+
+HEADER_PREFIX = b"#"
+
+
+class IoStats:
+    """Counters of files and bytes read and written, for instrumentation"""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.files_read = 0
+        self.bytes_read = 0
+        self.files_written = 0
+        self.files_unchanged = 0
+        self.bytes_written = 0
+
+    def reset(self):
+        """Reset all counters to zero"""
+        self.files_read = 0
+        self.bytes_read = 0
+        self.files_written = 0
+        self.files_unchanged = 0
+        self.bytes_written = 0
+
+
+STATS = IoStats()
 
 
 def read_json(path):
-    """Read JSON file to dictionary."""
-    with open(path, encoding="utf-8") as file:
-        lines = file.readlines()
-        if lines[0].startswith("#"):
-            lines = lines[1:]
-        data = json.loads("".join(lines))
-    return data
+    """Read JSON file to dictionary. Compressed files are decompressed transparently."""
+    content, _ = compression.read_file(path)
+
+    STATS.files_read += 1
+    STATS.bytes_read += len(content)
+
+    return get_backend().loads(_skip_header(content))
 
 
 def write_json(data, path, pretty=False):
-    """Write dictionary to JSON file."""
-    with open(path, "w", encoding="utf-8") as file:
-        if pretty:
-            json.dump(data, file, indent=4)
-        else:
-            json.dump(data, file)
+    """
+    Write dictionary to JSON file.
+
+    The file is replaced atomically, and keeps the version header line
+    and the compression format of the existing file.
+    Returns False if the file's content was already identical, and writing was skipped.
+    """
+    content = get_backend().dumps(data, pretty=pretty)
+
+    existing = None
+    file_compression = None
+    if os.path.exists(path):
+        existing, file_compression = compression.read_file(path)
+        content = _header(existing) + content
+
+    if content == existing:
+        STATS.files_unchanged += 1
+        return False
+
+    content = compression.compress(content, file_compression)
+    _write_atomic(path, content)
+    STATS.files_written += 1
+    STATS.bytes_written += len(content)
+    return True
+
+
+def _header(content):
+    """The optional version header line of the content, including the line break"""
+    if not content.startswith(HEADER_PREFIX):
+        return b""
+    end = content.find(b"\n")
+    if end < 0:
+        return content + b"\n"
+    return content[: end + 1]
+
+
+def _write_atomic(path, content):
+    """Write to a temporary file in the same directory, and replace the file by it"""
+    directory = os.path.dirname(os.path.abspath(path))
+    if os.path.exists(path):
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+
+    handle, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=".{}.".format(os.path.basename(path)), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def _skip_header(content):
+    """The content after the optional version header line (e.g. '# version 33'), without copying"""
+    if not content.startswith(HEADER_PREFIX):
+        return content
+    end = content.find(b"\n")
+    if end < 0:
+        return b""
+    return memoryview(content)[end + 1 :]
@@ -0,0 +1,75 @@
+"""
+Pluggable JSON backends.
+
+The fastest installed backend is used by default, see set_backend(name).
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class StdlibBackend:
+    """JSON backend using the standard library"""
+
+    name = "json"
+
+    @staticmethod
+    def loads(text):
+        """Parse JSON from a string, bytes or a memoryview of UTF-8 encoded bytes"""
+        if isinstance(text, memoryview):
+            text = str(text, "utf-8")
+        return json.loads(text)
+
+    @staticmethod
+    def dumps(data, pretty=False):
+        """Serialize to UTF-8 encoded JSON bytes, compact like the game writes it"""
+        if pretty:
+            text = json.dumps(data, indent=4, ensure_ascii=False)
+        else:
+            text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        return text.encode("utf-8")
+
+
+class OrjsonBackend(StdlibBackend):
+    """JSON backend using orjson for parsing"""
+
+    name = "orjson"
+
+    @staticmethod
+    def loads(text):
+        """Parse JSON from a string, bytes or a memoryview of UTF-8 encoded bytes"""
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # NaN and Infinity are only accepted by the standard library
+            return StdlibBackend.loads(text)
+
+    # orjson formats floats in exponent notation differently (1e16 vs. 1e+16),
+    # so serialization is inherited to keep written files independent of the backend
+
+
+BACKENDS = {StdlibBackend.name: StdlibBackend}
+if orjson is not None:
+    BACKENDS[OrjsonBackend.name] = OrjsonBackend
+
+_BACKEND = BACKENDS.get(OrjsonBackend.name, StdlibBackend)
+
+
+def get_backend():
+    """The active JSON backend"""
+    return _BACKEND
+
+
+def set_backend(name):
+    """Set the active JSON backend by name. Raises ValueError if it is not installed."""
+    global _BACKEND  # pylint: disable=global-statement
+    if name not in BACKENDS:
+        raise ValueError(
+            "JSON backend '{}' is not available. Available backends: {}".format(
+                name, ", ".join(BACKENDS)
+            )
+        )
+    _BACKEND = BACKENDS[name]
@@ -0,0 +1,86 @@
+"""
+Transparent compression of save files.
+
+The compression format is detected from the file header (magic bytes),
+independent of the file name.
+Formats: gzip, bz2, xz, and zstd if package zstandard is installed.
+"""
+import bz2
+import contextlib
+import gzip
+import io
+import lzma
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC_LENGTH = 6
+
+
+def _gzip_compress(content):
+    buffer = io.BytesIO()
+    # fixed mtime, for identical output for identical content
+    with gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) as file:
+        file.write(content)
+    return buffer.getvalue()
+
+
+# format name: (magic bytes, open a binary file for decompression, compress bytes)
+FORMATS = {
+    "gzip": (b"\x1f\x8b", lambda file: gzip.GzipFile(fileobj=file), _gzip_compress),
+    "bz2": (b"BZh", bz2.BZ2File, bz2.compress),
+    "xz": (b"\xfd7zXZ\x00", lzma.LZMAFile, lzma.compress),
+}
+if zstandard is not None:
+    FORMATS["zstd"] = (
+        b"\x28\xb5\x2f\xfd",
+        lambda file: zstandard.ZstdDecompressor().stream_reader(file),
+        lambda content: zstandard.ZstdCompressor().compress(content),
+    )
+
+
+def detect(header):
+    """Compression format of a file by its first bytes, or None if uncompressed"""
+    for name, (magic, _, _) in FORMATS.items():
+        if header.startswith(magic):
+            return name
+    return None
+
+
+@contextlib.contextmanager
+def open_file(path):
+    """Open a file for binary reading, with streaming decompression if compressed"""
+    with open(path, "rb") as file:
+        compression = detect(file.read(MAGIC_LENGTH))
+        file.seek(0)
+        if compression is None:
+            yield file
+        else:
+            with FORMATS[compression][1](file) as stream:
+                yield stream
+
+
+def read_file(path):
+    """Read a file's content, decompressed. Returns a tuple (content, compression format)"""
+    with open(path, "rb") as file:
+        compression = detect(file.read(MAGIC_LENGTH))
+        file.seek(0)
+        if compression is None:
+            return file.read(), None
+        with FORMATS[compression][1](file) as stream:
+            return stream.read(), compression
+
+
+def compress(content, compression):
+    """Compress bytes in the given format, or return them unchanged if the format is None"""
+    if compression is None:
+        return content
+    if compression not in FORMATS:
+        raise ValueError(
+            "Compression format '{}' is not available. Available formats: {}".format(
+                compression, ", ".join(FORMATS)
+            )
+        )
+    return FORMATS[compression][2](content)
@@ -0,0 +1,170 @@
+"""
+Extraction of single values from large JSON files, without parsing the entire file.
+"""
+import json
+import re
+
+from . import compression
+
+CHUNK_SIZE = 1 << 16
+
+# Characters that may follow a complete value
+DELIMITERS = " \t\r\n,]}"
+
+# Bytes kept unprocessed at the end of a chunk, where a key may be cut off
+KEY_TAIL = 256
+
+_DECODER = json.JSONDecoder()
+
+
+def read_value(path, keys):
+    """
+    Read the value at a path of object keys from a JSON file,
+    e.g. ["player", "name"]. Returns None if the path is not found.
+
+    See read_values(path, key_paths).
+    """
+    return read_values(path, [keys])[0]
+
+
+def read_values(path, key_paths):
+    """
+    Read the values at paths of object keys from a JSON file, in a single pass,
+    e.g. [["player", "name"], ["om_x"]]. Values of paths not found are None.
+
+    The file is scanned in chunks for the first keys of the paths, tracking
+    the nesting depth only to tell top-level keys from nested ones.
+    Only the values of these top-level keys are parsed,
+    and scanning stops as soon as all of them are found.
+    Compressed files are decompressed while scanning.
+    """
+    first_keys = {keys[0] for keys in key_paths}
+    members = {}
+
+    with compression.open_file(path) as file:
+        for key, value in _Scanner(file).members(first_keys):
+            members.setdefault(key, value)
+            if len(members) == len(first_keys):
+                break
+
+    return [_lookup(members, keys) for keys in key_paths]
+
+
+def _lookup(value, keys):
+    """The value at a path of keys in nested dictionaries, or None"""
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+class _Scanner:
+    """Scans a JSON stream, holding only the unprocessed part in memory"""
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self, file):
+        self.file = file
+        self.buffer = b""
+        self.eof = False
+
+    def members(self, keys):
+        """Iterate (key, value) of the members of the top-level object with the given keys"""
+        pattern = re.compile(
+            rb'"('
+            + b"|".join(
+                re.escape(json.dumps(key).encode("utf-8")[1:-1]) for key in keys
+            )
+            + rb')"\s*:'
+        )
+
+        depth = 0
+        in_string = False
+        pos = 0
+        while True:
+            match = pattern.search(self.buffer, pos)
+            if match is None:
+                if self.eof:
+                    return
+                end = _safe_end(self.buffer, pos, len(self.buffer) - KEY_TAIL)
+                depth, in_string = _advance(self.buffer[pos:end], depth, in_string)
+                pos = 0
+                self._read(end)
+                continue
+
+            start = match.start()
+            if start > 0 and self.buffer[start - 1] == ord("\\"):
+                # an escaped quote inside a string
+                depth, in_string = _advance(
+                    self.buffer[pos : start + 1], depth, in_string
+                )
+                pos = start + 1
+                continue
+
+            depth, in_string = _advance(self.buffer[pos:start], depth, in_string)
+            if in_string or depth != 1:
+                depth, in_string = _advance(b'"', depth, in_string)
+                pos = start + 1
+                continue
+
+            value, pos = self._value(match.end())
+            yield json.loads(b'"' + match.group(1) + b'"'), value
+
+    def _value(self, start):
+        """
+        Decode the JSON value starting at a position in the buffer.
+        Returns the value and the position after it.
+        """
+        while True:
+            text = self.buffer[start:].decode("utf-8", errors="ignore")
+            stripped = text.lstrip()
+            try:
+                value, end = _DECODER.raw_decode(stripped)
+                # a number may continue in the next chunk, e.g. '-2.' or '1e'
+                if self.eof or (end < len(stripped) and stripped[end] in DELIMITERS):
+                    consumed = len(text) - len(stripped) + end
+                    return value, start + len(text[:consumed].encode("utf-8"))
+            except ValueError:
+                if self.eof:
+                    raise
+            # read at least as much as is buffered, so that large values
+            # are decoded again only a logarithmic number of times
+            self._read(start, max(CHUNK_SIZE, len(self.buffer) - start))
+            start = 0
+
+    def _read(self, keep_from, size=CHUNK_SIZE):
+        """Read more data, dropping data before a position"""
+        self.buffer = self.buffer[keep_from:]
+        chunk = self.file.read(size)
+        if len(chunk) == 0:
+            self.eof = True
+        self.buffer += chunk
+
+
+def _safe_end(buffer, start, end):
+    """
+    A position to cut a buffer between start and end,
+    before any backslashes, so that escapes are not cut off
+    """
+    end = max(start, end)
+    while end > start and buffer[end - 1] == ord("\\"):
+        end -= 1
+    return end
+
+
+def _advance(data, depth, in_string):
+    """
+    Nesting depth and whether inside a string after a piece of JSON,
+    given the state before it. Escapes must not be cut off at the end of the piece.
+    """
+    # drop escaped backslashes and quotes, so that all remaining quotes delimit strings
+    parts = data.replace(b"\\\\", b"").replace(b'\\"', b"").split(b'"')
+    structure = b"".join(parts[1::2] if in_string else parts[0::2])
+    depth += (
+        structure.count(b"{")
+        + structure.count(b"[")
+        - structure.count(b"}")
+        - structure.count(b"]")
+    )
+    return depth, in_string != (len(parts) % 2 == 0)
@@ -0,0 +1,32 @@
+"""Processing of files in batches, in a pool of worker processes"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+BATCHES_PER_WORKER = 4
+
+
+def map_batches(func, items, workers, *args):
+    """
+    Apply func(batch, *args) to batches of items, yielding the results in batch order.
+
+    With more than one worker, batches are processed in worker processes,
+    with several batches per worker for load balancing.
+    Otherwise, all items are processed as a single batch in this process.
+    Batches not yet started are cancelled when the iteration is stopped early.
+    """
+    if workers <= 1 or len(items) < 2:
+        yield func(items, *args)
+        return
+
+    batch_size = math.ceil(len(items) / (workers * BATCHES_PER_WORKER))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(func, items[i : i + batch_size], *args)
+            for i in range(0, len(items), batch_size)
+        ]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
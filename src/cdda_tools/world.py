@@ -0,0 +1,230 @@
+"""
+Indexes of world save data.
+"""
+import array
+import os
+import sys
+from os import path
+
+from . import cache
+from . import json_utils as json
+
+MAP_FILE_EXTENSION = ".map"
+
+
+def read_vehicle_index(maps_dir, cache_dir):
+    """
+    Index of the vehicles in a world's map files, by vehicle name:
+    {name: [(map file, submap coordinates), ...]}.
+
+    The index is cached in cache_dir. Only map files that changed since
+    the last call (by size and modification time) are read again.
+    """
+    files = _read_file_index(
+        cache_dir, "world_vehicles", maps_dir, map_files(maps_dir), _map_vehicles
+    )
+
+    index = {}
+    for file, vehicles in files.items():
+        for name, coordinates in vehicles:
+            index.setdefault(name, []).append((file, coordinates))
+    return index
+
+
+def read_terrain_index(world_dir, overmap_files, cache_dir):
+    """
+    Index of the terrain locations in overmap files:
+    {overmap file: [{terrain id: packed runs}, ...]}, with one dict per z-level.
+    Packed runs are arrays of unsigned shorts, alternating tile index and length of each run.
+
+    The index is cached in cache_dir, and only changed overmaps are read again.
+    """
+    return _read_file_index(
+        cache_dir, "world_terrain", world_dir, overmap_files, _overmap_terrain
+    )
+
+
+def read_seen_index(world_dir, seen_files, cache_dir):
+    """
+    Bitsets of the seen tiles in seen files: {seen file: [bitset, ...]},
+    with one bitset per z-level (see rle_mask).
+
+    The index is cached in cache_dir, and only changed seen files are read again.
+    """
+    return _read_file_index(cache_dir, "world_seen", world_dir, seen_files, _seen_masks)
+
+
+def _read_file_index(cache_dir, kind, directory, files, build):
+    """
+    Values derived from files by build(file), cached per file in cache_dir: {file: value}.
+    Values are rebuilt only for files that changed.
+    Cached values of other files in the directory are kept, unless the file was deleted.
+    """
+    cache_path = cache.cache_file(cache_dir, kind, directory)
+    cached = cache.load(cache_path) or {}
+
+    entries = {}
+    result = {}
+    for file in files:
+        rel_path = path.relpath(file, directory)
+        stamp = cache.file_stamp(file)
+        entry = cached.get(rel_path)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, build(file))
+        entries[rel_path] = entry
+        result[file] = entry[1]
+
+    for rel_path, entry in cached.items():
+        if rel_path not in entries and path.exists(path.join(directory, rel_path)):
+            entries[rel_path] = entry
+
+    if entries != cached:
+        cache.store(cache_path, entries)
+
+    return result
+
+
+class TerrainTable:
+    """
+    Interned terrain ids, shared by decoded terrain layers.
+    Terrain ids are mapped to small integer codes, in order of appearance.
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    def __init__(self):
+        self.terrains = []
+        self._codes = {}
+
+    def code(self, terrain):
+        """The code of a terrain id, added to the table if not present yet"""
+        code = self._codes.get(terrain)
+        if code is None:
+            code = self._codes[terrain] = len(self.terrains)
+            self.terrains.append(sys.intern(terrain))
+        return code
+
+
+class TerrainLayer:
+    """
+    Overmap terrain layer, decoded from run-length encoding to a grid of terrain codes.
+    The grid is a string with one character per tile, so that masks for sets
+    of terrain codes are extracted by str.translate rather than per tile.
+    """
+
+    def __init__(self, layer, table):
+        codes = [table.code(terrain) for terrain, _ in layer]
+        self.table = table
+        self.codes = frozenset(codes)
+        self.grid = "".join(
+            chr(code) * length for code, (_, length) in zip(codes, layer)
+        )
+
+    def terrain(self, index):
+        """The terrain id of the tile at an index"""
+        return self.table.terrains[ord(self.grid[index])]
+
+    def mask(self, codes):
+        """Bitset of all tiles with one of the given terrain codes"""
+        mapping = {code: "1" if code in codes else "0" for code in self.codes}
+        return int(self.grid.translate(mapping)[::-1] or "0", 2)
+
+
+def rle_mask(layer, predicate=bool):
+    """
+    Decode a run-length encoded overmap layer, [[value, length], ...], to a bitset:
+    an int with bit i set if the value of tile i satisfies the predicate.
+    E.g. for seen layers, the mask of all seen tiles.
+    """
+    # the string is in reverse tile order, as the last digit is the least significant bit
+    bits = "".join(
+        ("1" if predicate(value) else "0") * length for value, length in reversed(layer)
+    )
+    return int(bits or "0", 2)
+
+
+def mask_bits(mask):
+    """
+    A bitset as a string of "0" and "1" in tile order, for O(1) lookups of single tiles.
+    The string ends at the highest set bit.
+    """
+    return bin(mask)[:1:-1]
+
+
+def mask_indices(mask):
+    """Iterate the indices of the set bits of a bitset, in ascending order"""
+    bits = mask_bits(mask)
+    index = bits.find("1")
+    while index >= 0:
+        yield index
+        index = bits.find("1", index + 1)
+
+
+def submap_items(submap, contents=True):
+    """
+    Iterate all items of a submap from a map file, as (x, y, item, count).
+    Includes items in containers, unless contents is False.
+    Count is the size of the stack the item is in.
+    """
+    items = submap.get("items", [])
+    for i in range(0, len(items) - 2, 3):
+        x_coord, y_coord, stack = items[i : i + 3]
+        for entry in stack:
+            if isinstance(entry, list):
+                item, count = entry[0], entry[1]
+            else:
+                item, count = entry, 1
+            if not contents:
+                yield x_coord, y_coord, item, count
+                continue
+            for nested in _with_contents(item):
+                yield x_coord, y_coord, nested, count
+
+
+def _with_contents(item):
+    """An item and all items in its contents, recursively"""
+    yield item
+    contents = item.get("contents")
+    if isinstance(contents, dict):
+        # item pockets: {"contents": [{"pocket_type": ..., "contents": [items]}, ...]}
+        for pocket in contents.get("contents", []):
+            for nested in pocket.get("contents", []):
+                yield from _with_contents(nested)
+    elif isinstance(contents, list):
+        for nested in contents:
+            yield from _with_contents(nested)
+
+
+def map_files(maps_dir):
+    """Iterate all map files in a world's maps directory"""
+    for directory, _, files in os.walk(maps_dir):
+        for file in files:
+            if file.endswith(MAP_FILE_EXTENSION):
+                yield path.join(directory, file)
+
+
+def _overmap_terrain(overmap_file):
+    """Packed runs of each terrain id, per z-level of an overmap file"""
+    levels = []
+    for layer in json.read_json(overmap_file)["layers"]:
+        runs = {}
+        pos = 0
+        for terrain, length in layer:
+            runs.setdefault(sys.intern(terrain), array.array("H")).extend((pos, length))
+            pos += length
+        levels.append(runs)
+    return levels
+
+
+def _seen_masks(seen_file):
+    """Bitsets of the seen tiles per z-level of a seen file"""
+    return [rle_mask(layer) for layer in json.read_json(seen_file)["visible"]]
+
+
+def _map_vehicles(map_file):
+    """Names and submap coordinates of all vehicles in a map file"""
+    return [
+        (vehicle["name"], tuple(submap["coordinates"]))
+        for submap in json.read_json(map_file)
+        for vehicle in submap.get("vehicles", [])
+    ]
@@ -0,0 +1,56 @@
+import io
+import shutil
+import tempfile
+import unittest
+from os import path
+from unittest import mock
+
+from cdda_tools import cli
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.batch_file = path.join(self.test_dir, "commands.txt")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_batch(self):
+        commands = [
+            "show-data ids *resin --list",
+            "# comment",
+            "",
+            "show-data path skill --keys",
+        ]
+        with open(self.batch_file, "w", encoding="utf-8") as file:
+            file.write("\n".join(commands))
+
+        args = cli.parse_args(["-d=./tests/test_data", "batch", self.batch_file])
+        lines = [line for line in cli.run_cli(args)]
+
+        expected = ["----- show-data ids *resin --list -----"]
+        expected += cli.run_cli(
+            cli.parse_args(["-d=./tests/test_data"] + commands[0].split())
+        )
+        expected += ["----- show-data path skill --keys -----"]
+        expected += cli.run_cli(
+            cli.parse_args(["-d=./tests/test_data"] + commands[3].split())
+        )
+
+        self.assertEqual(lines, expected)
+
+    def test_batch_errors(self):
+        commands = "show-data path abcdefg\nserve\nshow-data ids *resin --list\n"
+
+        args = cli.parse_args(["-d=./tests/test_data", "batch"])
+        with mock.patch("sys.stdin", io.StringIO(commands)):
+            lines = []
+            with self.assertRaises(ValueError):
+                for line in cli.run_cli(args):
+                    lines.append(line)
+
+        self.assertEqual(lines[0], "----- show-data path abcdefg -----")
+        self.assertEqual(lines[2], "----- serve -----")
+        self.assertEqual(lines[4], "----- show-data ids *resin --list -----")
+        self.assertGreater(len(lines), 5)
@@ -1,6 +1,9 @@
+import json
+import os
 import shutil
 import tempfile
 import unittest
+from os import path
 
 from cdda_tools import cli
 
@@ -40,3 +43,81 @@ class TestFind(unittest.TestCase):
         )
         lines = [line for line in cli.run_cli(args)]
         self.assertEqual(len(lines), 0)
+
+    def test_find_items_nothing(self):
+        args = cli.parse_args(
+            [
+                f"-d={self.test_dir}",
+                "find",
+                "-w=WorldA",
+                "items",
+                "abcdefg",
+            ]
+        )
+        lines = [line for line in cli.run_cli(args)]
+        self.assertEqual(lines, ["No items found for globs ['abcdefg']"])
+
+
+class TestFindItems(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.maps_dir = path.join(self.test_dir, "save", "WorldItems", "maps")
+
+        toolbox = {
+            "typeid": "toolbox",
+            "contents": {
+                "contents": [{"pocket_type": 2, "contents": [{"typeid": "wrench"}]}]
+            },
+        }
+        self._write_map(
+            "0.0.0/0.0.0.map", [[1, 2, [toolbox, [{"typeid": "wrench"}, 2]]]]
+        )
+        self._write_map("0.0.1/0.0.1.map", [[0, 0, [[{"typeid": "wrench"}, 5]]]])
+        # first tile of the next map chunk
+        self._write_map("1.0.0/32.0.0.map", [[5, 5, [{"typeid": "wrench"}]]])
+        self._write_map(
+            "-1.-1.0/-1.-1.0.map",
+            [[0, 0, [{"typeid": "wrench_set"}, {"typeid": "rock"}]]],
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_map(self, rel_path, items):
+        file = path.join(self.maps_dir, rel_path)
+        os.makedirs(path.dirname(file), exist_ok=True)
+        content = [{"items": [value for item in items for value in item]}]
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(content, f)
+
+    def _find(self, options):
+        args = cli.parse_args(
+            [f"-d={self.test_dir}", "find", "-w=WorldItems", "items", "*wrench*"]
+            + options
+        )
+        return [line for line in cli.run_cli(args)]
+
+    def test_find_items(self):
+        self.assertEqual(
+            self._find([]),
+            [
+                "-1'179, -1'179, 0:    1  wrench_set",
+                "0'0, 0'0, 0:    3  wrench",
+                "0'0, 0'0, 1:    5  wrench",
+                "0'32, 0'0, 0:    1  wrench",
+            ],
+        )
+
+    def test_find_items_bounded(self):
+        self.assertEqual(
+            self._find(["--rect", "0'0", "0'0", "0'32", "0'0", "-z", "0"]),
+            ["0'0, 0'0, 0:    3  wrench", "0'32, 0'0, 0:    1  wrench"],
+        )
+        self.assertEqual(
+            self._find(["--rect", "0'0", "0'0", "0'31", "0'0", "-z", "0", "1"]),
+            ["0'0, 0'0, 0:    3  wrench", "0'0, 0'0, 1:    5  wrench"],
+        )
+        self.assertEqual(
+            self._find(["--rect", " -1'179", " -1'179", "0'0", "0'0", "-z", "1"]),
+            ["0'0, 0'0, 1:    5  wrench"],
+        )
@@ -1,6 +1,9 @@
+import json
+import os
 import shutil
 import tempfile
 import unittest
+from os import path
 
 from cdda_tools import cli
 
@@ -28,6 +31,23 @@ class TestList(unittest.TestCase):
         _lines = [line for line in cli.run_cli(args)]
 
     def test_list_fail(self):
+        for position in [
+            ["0'00"],
+            ["0'00", "0'00", "--rect", "0'00", "0'00", "0'03", "0'02"],
+        ]:
+            args = cli.parse_args(
+                [
+                    f"-d={self.test_dir}",
+                    "list",
+                    "-w=WorldA",
+                    "--z-level",
+                    "0",
+                ]
+                + position
+            )
+            with self.assertRaises(ValueError):
+                _lines = [line for line in cli.run_cli(args)]
+
         with self.assertRaises(SystemExit):
             _args = cli.parse_args(
                 [
@@ -35,7 +55,60 @@ class TestList(unittest.TestCase):
                     "list",
                     "-w=WorldA",
                     "0'00",
-                    "--z-level",
-                    "0",
+                    "0'00",
+                    "--radius",
+                    "2",
+                    "--rect",
+                    "0'00",
+                    "0'00",
+                    "0'03",
+                    "0'02",
                 ]
             )
+
+
+class TestListArea(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.maps_dir = path.join(self.test_dir, "save", "WorldItems", "maps")
+
+        toolbox = {"typeid": "toolbox", "contents": [{"typeid": "wrench"}]}
+        self._write_map(
+            "0.0.0/0.0.0.map", [[[{"typeid": "wrench"}, 2], {"typeid": "rock"}]]
+        )
+        self._write_map("0.0.0/1.1.0.map", [[[{"typeid": "rock"}, 3]]])
+        self._write_map("0.0.0/2.0.0.map", [[{"typeid": "rock"}]])
+        self._write_map("0.0.1/0.0.1.map", [[[{"typeid": "rock"}, 10]]])
+        # last tile of the first map chunk, and first tile of the next one
+        self._write_map("0.0.0/31.0.0.map", [[{"typeid": "hammer"}]])
+        self._write_map("1.0.0/32.0.0.map", [[{"typeid": "hammer"}], [toolbox]])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_map(self, rel_path, stacks):
+        file = path.join(self.maps_dir, rel_path)
+        os.makedirs(path.dirname(file), exist_ok=True)
+        items = [value for i, stack in enumerate(stacks) for value in [i, 0, stack]]
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump([{"items": items}], f)
+
+    def _list(self, options):
+        args = cli.parse_args(
+            [f"-d={self.test_dir}", "list", "-w=WorldItems"]
+            + options
+            + ["--z-level", "0"]
+        )
+        return [line for line in cli.run_cli(args)]
+
+    def test_list_radius(self):
+        self.assertEqual(
+            self._list(["0'00", "0'00", "--radius", "1"]),
+            ["   4  rock", "   2  wrench"],
+        )
+
+    def test_list_rect(self):
+        self.assertEqual(
+            self._list(["--rect", "0'31", "0'00", "0'32", "0'00"]),
+            ["   2  hammer", "   1  toolbox"],
+        )
@@ -0,0 +1,66 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from os import path
+
+from cdda_tools import cli
+from cdda_tools.commands.serve import ServerError
+
+
+class TestServe(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.socket = path.join(self.test_dir, "test.sock")
+
+        self.server = subprocess.Popen(
+            [sys.executable, "-m", "cdda_tools", "serve", f"--socket={self.socket}"],
+            stdout=subprocess.DEVNULL,
+        )
+        for _ in range(100):
+            if path.exists(self.socket):
+                break
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.server.terminate()
+        self.server.wait()
+        shutil.rmtree(self.test_dir)
+
+    def test_remote(self):
+        args = [
+            "-d=./tests/test_data",
+            "show-data",
+            "ids",
+            "*resin",
+            "--list",
+        ]
+        lines = [line for line in cli.run_cli(cli.parse_args(args))]
+        for _ in range(2):
+            remote_args = cli.parse_args([f"--server={self.socket}"] + args)
+            remote_lines = [line for line in cli.run_cli(remote_args)]
+            self.assertEqual(remote_lines, lines)
+
+    def test_remote_error(self):
+        args = cli.parse_args(
+            [
+                f"--server={self.socket}",
+                "-d=./tests/test_data",
+                "show-data",
+                "path",
+                "abcdefg",
+            ]
+        )
+        with self.assertRaises(ServerError):
+            _lines = [line for line in cli.run_cli(args)]
+
+    def test_remote_batch(self):
+        batch_file = path.join(self.test_dir, "commands.txt")
+        with open(batch_file, "w", encoding="utf-8") as file:
+            file.write("show-data path skill --keys\n")
+
+        args = cli.parse_args([f"--server={self.socket}", "batch", batch_file])
+        with self.assertRaises(ServerError):
+            _lines = [line for line in cli.run_cli(args)]
@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+
+from cdda_tools import cli
+
+
+class TestShowData(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def run_show_data(self, *args):
+        args = cli.parse_args(["-d=./tests/test_data", "show-data", *args])
+        return [line for line in cli.run_cli(args)]
+
+    def test_ids(self):
+        lines = self.run_show_data("ids", "*resin", "--list")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("generic_polymer_resin"))
+
+    def test_ids_stream(self):
+        lines = self.run_show_data("ids", "*", "--list")
+        lines_stream = self.run_show_data("ids", "*", "--list", "--stream")
+        self.assertEqual(lines_stream, lines)
+
+    def test_pairs(self):
+        lines = self.run_show_data("pairs", "type", "recipe", "--list")
+        self.assertEqual(len(lines), 3)
+
+    def test_pairs_stream(self):
+        lines = self.run_show_data("pairs", "name", "*Res*")
+        lines_stream = self.run_show_data("pairs", "name", "*Res*", "--stream")
+        self.assertEqual(lines_stream, lines)
+
+    def test_pairs_index(self):
+        pairs = ["name", "*Res*", "type", "material"]
+        lines = self.run_show_data("pairs", *pairs)
+        lines_index = self.run_show_data("pairs", *pairs, "--index")
+        self.assertEqual(lines_index, lines)
+
+        args = cli.parse_args(
+            [
+                "-d=./tests/test_data",
+                f"--cache-dir={self.cache_dir}",
+                "show-data",
+                "pairs",
+                *pairs,
+                "--index",
+            ]
+        )
+        lines_cached = [line for line in cli.run_cli(args)]
+        lines_cached_warm = [line for line in cli.run_cli(args)]
+        self.assertEqual(lines_cached, lines)
+        self.assertEqual(lines_cached_warm, lines)
+
+    def test_pairs_nothing(self):
+        lines = self.run_show_data("pairs", "name", "abcdefg", "--index")
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith("No data found"))
+
+    def test_ids_prefix(self):
+        lines = self.run_show_data("ids", "ep*", "gen*", "--list")
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith("generic_polymer_resin"))
+        self.assertTrue(lines[1].startswith("epoxy"))
@@ -0,0 +1,73 @@
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import cdda_tools
+from cdda_tools.compact import FrozenDict, FrozenList, compact_data
+
+
+class TestCompact(unittest.TestCase):
+    def test_compact_equal(self):
+        data = cdda_tools.game.read_game_data("./tests/test_data")
+        compact = cdda_tools.game.read_game_data("./tests/test_data", compact=True)
+        self.assertEqual(compact, data)
+
+    def test_compact_shared(self):
+        compact = cdda_tools.game.read_game_data("./tests/test_data", compact=True)
+        materials = compact["material"]
+        self.assertIs(
+            materials["thermo_resin"]["burn_data"],
+            materials["epoxy"]["burn_data"],
+        )
+
+    def test_compact_immutable(self):
+        compact = compact_data({"TOOL": {"a": {"id": "a", "flags": ["X"]}}})
+        entry = compact["TOOL"]["a"]
+        self.assertIsInstance(entry, FrozenDict)
+        self.assertIsInstance(entry["flags"], FrozenList)
+        with self.assertRaises(TypeError):
+            entry["id"] = "b"
+        with self.assertRaises(TypeError):
+            entry["flags"].append("Y")
+
+    def test_compact_pickle(self):
+        compact = compact_data({"TOOL": {"a": {"id": "a", "flags": ["X"]}}})
+        self.assertEqual(pickle.loads(pickle.dumps(compact)), compact)
+
+    def test_compact_types(self):
+        compact = compact_data({"T": [{"a": 1, "b": 1.0, "c": True}]})
+        entry = compact["T"][0]
+        self.assertIs(type(entry["a"]), int)
+        self.assertIs(type(entry["b"]), float)
+        self.assertIs(type(entry["c"]), bool)
+
+    def test_compact_negative_zero(self):
+        compact = compact_data(
+            {"T": [{"a": 0.0}, {"a": -0.0}, {"b": 0.0}, {"b": -0.0}]}
+        )
+        entries = compact["T"]
+        self.assertEqual(repr(entries[0]["a"]), "0.0")
+        self.assertEqual(repr(entries[1]["a"]), "-0.0")
+        self.assertEqual(repr(entries[2]["b"]), "0.0")
+        self.assertEqual(repr(entries[3]["b"]), "-0.0")
+
+    def test_compact_cached(self):
+        data = cdda_tools.game.read_game_data("./tests/test_data")
+        cache_dir = tempfile.mkdtemp()
+        try:
+            for _ in range(2):
+                compact = cdda_tools.game.read_game_data(
+                    "./tests/test_data", cache_dir=cache_dir, compact=True
+                )
+                self.assertEqual(compact, data)
+                self.assertIsInstance(compact["material"]["epoxy"], FrozenDict)
+
+            with mock.patch("cdda_tools.compact.Compactor.compact") as compact_value:
+                cdda_tools.game.read_game_data(
+                    "./tests/test_data", cache_dir=cache_dir, compact=True
+                )
+                compact_value.assert_not_called()
+        finally:
+            shutil.rmtree(cache_dir)
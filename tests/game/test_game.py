@@ -1,4 +1,9 @@
+import os
+import shutil
+import tempfile
 import unittest
+from os import path
+from unittest import mock
 
 import cdda_tools
 
@@ -13,3 +18,169 @@ class TestJson(unittest.TestCase):
         data = cdda_tools.game.read_game_data("./tests/test_data", ["skill"])
         self.assertTrue(isinstance(data, dict))
         self.assertEqual(len(data), 1)
+
+    def test_read_game_data_mods(self):
+        data = cdda_tools.game.read_game_data(
+            "./tests/test_data", ["skill"], mods=["dda", "test_mod"]
+        )
+        self.assertEqual(list(data["skill"].keys()), ["speech", "computer", "tailor"])
+        self.assertEqual(data["skill"]["computer"]["name"], {"str": "hacking"})
+
+        core = cdda_tools.game.read_game_data("./tests/test_data", ["skill"])
+        self.assertEqual(core["skill"]["computer"]["name"], {"str": "computers"})
+
+    def test_read_game_data_missing_mod(self):
+        with self.assertRaises(ValueError):
+            cdda_tools.game.read_game_data("./tests/test_data", mods=["abcdefg"])
+
+        data = cdda_tools.game.read_game_data(
+            "./tests/test_data", ["skill"], mods=["abcdefg"], skip_missing_mods=True
+        )
+        core = cdda_tools.game.read_game_data("./tests/test_data", ["skill"])
+        self.assertEqual(data, core)
+
+    def test_iter_game_data(self):
+        data = cdda_tools.game.read_game_data("./tests/test_data")
+        records = list(cdda_tools.game.iter_game_data("./tests/test_data"))
+        with_id = [(tp, key) for tp, key, _ in records if key is not None]
+        self.assertEqual(
+            with_id,
+            [
+                (tp, key)
+                for tp, entries in data.items()
+                if isinstance(entries, dict)
+                for key in entries
+            ],
+        )
+
+    def test_iter_game_data_filtered(self):
+        records = list(
+            cdda_tools.game.iter_game_data(
+                "./tests/test_data",
+                type_filter=lambda tp: tp == "material",
+                id_filter=lambda key: key.endswith("resin"),
+            )
+        )
+        self.assertEqual(
+            [key for _, key, _ in records], ["generic_polymer_resin", "thermo_resin"]
+        )
+
+    def test_id_index(self):
+        data = cdda_tools.game.read_game_data("./tests/test_data")
+        index = cdda_tools.game.IdIndex(data)
+        self.assertEqual(
+            index.lookup(["e", "gen"], lambda key: True),
+            [("material", "generic_polymer_resin"), ("material", "epoxy")],
+        )
+        self.assertEqual(
+            index.lookup(["c", "s"], lambda key: True, "skill"),
+            [("skill", "speech"), ("skill", "computer")],
+        )
+        self.assertEqual(index.lookup(["x"], lambda key: True), [])
+
+
+class TestGameCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.game_dir = path.join(self.test_dir, "game")
+        self.cache_dir = path.join(self.test_dir, "cache")
+        shutil.copytree("./tests/test_data", self.game_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_read_game_data_cached(self):
+        data = cdda_tools.game.read_game_data(self.game_dir)
+        cold = cdda_tools.game.read_game_data(self.game_dir, cache_dir=self.cache_dir)
+        warm = cdda_tools.game.read_game_data(self.game_dir, cache_dir=self.cache_dir)
+        self.assertEqual(cold, data)
+        self.assertEqual(warm, data)
+        self.assertTrue(len(os.listdir(self.cache_dir)) > 0)
+
+    def test_read_game_data_cached_partial(self):
+        data = cdda_tools.game.read_game_data(
+            self.game_dir, ["skill"], cache_dir=self.cache_dir
+        )
+        self.assertEqual(list(data.keys()), ["skill"])
+
+    def test_read_game_data_cache_invalidation(self):
+        cdda_tools.game.read_game_data(self.game_dir, cache_dir=self.cache_dir)
+
+        skills_file = path.join(self.game_dir, "data", "json", "skills.json")
+        skills = cdda_tools.json_utils.read_json(skills_file)
+        skills[0]["name"] = {"str": "changed"}
+        cdda_tools.json_utils.write_json(skills, skills_file)
+        stat = os.stat(skills_file)
+        os.utime(skills_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        data = cdda_tools.game.read_game_data(self.game_dir, cache_dir=self.cache_dir)
+        self.assertEqual(data["skill"][skills[0]["id"]]["name"], {"str": "changed"})
+
+        os.remove(skills_file)
+        data = cdda_tools.game.read_game_data(self.game_dir, cache_dir=self.cache_dir)
+        self.assertNotIn("skill", data)
+
+    def test_read_game_data_in_memory(self):
+        with cdda_tools.cache.keep_in_memory():
+            data = cdda_tools.game.read_game_data(self.game_dir)
+            self.assertIs(cdda_tools.game.read_game_data(self.game_dir), data)
+
+            skills_file = path.join(self.game_dir, "data", "json", "skills.json")
+            stat = os.stat(skills_file)
+            os.utime(skills_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertIsNot(cdda_tools.game.read_game_data(self.game_dir), data)
+
+        self.assertIsNone(cdda_tools.cache.memory())
+
+    def test_read_game_data_parallel(self):
+        data = cdda_tools.game.read_game_data(self.game_dir)
+        parallel = cdda_tools.game.read_game_data(self.game_dir, workers=2)
+        self.assertEqual(parallel, data)
+        self.assertEqual(list(parallel.keys()), list(data.keys()))
+
+        cached = cdda_tools.game.read_game_data(
+            self.game_dir, cache_dir=self.cache_dir, workers=2
+        )
+        self.assertEqual(cached, data)
+
+    def test_read_game_data_mods_cached(self):
+        mods = ["dda", "test_mod"]
+        data = cdda_tools.game.read_game_data(self.game_dir, mods=mods)
+        for _ in range(2):
+            cached = cdda_tools.game.read_game_data(
+                self.game_dir, cache_dir=self.cache_dir, mods=mods
+            )
+            self.assertEqual(cached, data)
+
+        core = cdda_tools.game.read_game_data(self.game_dir, cache_dir=self.cache_dir)
+        self.assertNotIn("tailor", core["skill"])
+
+    def test_read_game_data_user_mods(self):
+        mods = ["dda", "test_mod"]
+        data = cdda_tools.game.read_game_data(self.game_dir, mods=mods)
+
+        shutil.move(
+            path.join(self.game_dir, "data", "mods"), path.join(self.game_dir, "mods")
+        )
+        user_mods = cdda_tools.game.read_game_data(self.game_dir, mods=mods)
+        self.assertEqual(user_mods, data)
+
+    def test_read_game_data_type_index(self):
+        data = cdda_tools.game.read_game_data(self.game_dir, ["skill", "material"])
+
+        with mock.patch(
+            "cdda_tools.json_utils.read_json", wraps=cdda_tools.json_utils.read_json
+        ) as read_json:
+            cold = cdda_tools.game.read_game_data(
+                self.game_dir, ["skill", "material"], cache_dir=self.cache_dir
+            )
+            self.assertEqual(read_json.call_count, 3)
+
+            read_json.reset_mock()
+            warm = cdda_tools.game.read_game_data(
+                self.game_dir, ["skill", "material"], cache_dir=self.cache_dir
+            )
+            self.assertEqual(read_json.call_count, 2)
+
+        self.assertEqual(cold, data)
+        self.assertEqual(warm, data)
@@ -0,0 +1,92 @@
+import unittest
+
+import cdda_tools
+from cdda_tools.inheritance import Resolver
+
+DATA = {
+    "GENERIC": {
+        "base_blade": {
+            "abstract": "base_blade",
+            "type": "GENERIC",
+            "weight": "1 kg",
+            "volume": "1 L",
+            "cutting": 20,
+            "flags": ["SHEATH_SWORD", "DURABLE_MELEE"],
+        },
+    },
+    "TOOL": {
+        "sword": {
+            "id": "sword",
+            "type": "TOOL",
+            "copy-from": "base_blade",
+            "name": "sword",
+            "relative": {"weight": "250 g", "cutting": 4},
+            "extend": {"flags": ["SHARP"]},
+            "delete": {"flags": ["DURABLE_MELEE"]},
+        },
+        "short_sword": {
+            "id": "short_sword",
+            "type": "TOOL",
+            "copy-from": "sword",
+            "name": "short sword",
+            "proportional": {"volume": 0.5, "cutting": 0.5},
+        },
+    },
+}
+
+
+class TestInheritance(unittest.TestCase):
+    def test_resolve(self):
+        resolver = Resolver(DATA)
+        sword = resolver.resolve("TOOL", "sword")
+        self.assertEqual(sword["id"], "sword")
+        self.assertNotIn("abstract", sword)
+        self.assertNotIn("copy-from", sword)
+        self.assertEqual(sword["weight"], "1250 g")
+        self.assertEqual(sword["cutting"], 24)
+        self.assertEqual(sword["flags"], ["SHEATH_SWORD", "SHARP"])
+
+    def test_resolve_chain(self):
+        resolver = Resolver(DATA)
+        short_sword = resolver.resolve("TOOL", "short_sword")
+        self.assertEqual(short_sword["name"], "short sword")
+        self.assertEqual(short_sword["weight"], "1250 g")
+        self.assertEqual(short_sword["volume"], "500 ml")
+        self.assertEqual(short_sword["cutting"], 12)
+        self.assertIs(resolver.resolve("TOOL", "short_sword"), short_sword)
+
+    def test_entries(self):
+        resolver = Resolver(DATA)
+        self.assertEqual([key for key, _ in resolver.entries("GENERIC")], [])
+        self.assertEqual(
+            [key for key, _ in resolver.entries("TOOL")], ["sword", "short_sword"]
+        )
+
+    def test_missing_parent(self):
+        resolver = Resolver({"TOOL": {"a": {"id": "a", "copy-from": "b"}}})
+        with self.assertRaises(ValueError):
+            resolver.resolve("TOOL", "a")
+
+    def test_resolve_self_override(self):
+        core = {"id": "knife", "type": "TOOL", "cutting": 10, "weight": "100 g"}
+        mod_1 = {"id": "knife", "type": "TOOL", "copy-from": "knife", "cutting": 12}
+        mod_2 = {
+            "id": "knife",
+            "type": "TOOL",
+            "copy-from": "knife",
+            "relative": {"weight": "50 g"},
+        }
+        data = cdda_tools.game.GameData({"TOOL": {"knife": mod_2}})
+        data.overridden = {"TOOL": {"knife": [core, mod_1]}}
+
+        knife = Resolver(data).resolve("TOOL", "knife")
+        self.assertEqual(knife["cutting"], 12)
+        self.assertEqual(knife["weight"], "150 g")
+        self.assertNotIn("copy-from", knife)
+
+    def test_resolve_game_data(self):
+        data = cdda_tools.game.read_game_data("./tests/test_data")
+        resolver = Resolver(data)
+        epoxy = resolver.resolve("material", "epoxy")
+        self.assertEqual(epoxy["density"], 1.0)
+        self.assertEqual(epoxy["name"], "Epoxy")
@@ -0,0 +1,24 @@
+import unittest
+
+from cdda_tools import parallel
+
+
+class TestParallel(unittest.TestCase):
+    def test_map_batches(self):
+        items = list(range(100))
+        serial = list(parallel.map_batches(sum, items, 1))
+        self.assertEqual(serial, [sum(items)])
+
+        batches = list(parallel.map_batches(sum, items, 3, 0))
+        self.assertEqual(len(batches), 12)
+        self.assertEqual(sum(batches), sum(items))
+        self.assertEqual(batches[0], sum(range(9)))
+
+    def test_map_batches_early_exit(self):
+        results = parallel.map_batches(sum, list(range(100)), 2)
+        self.assertEqual(next(results), sum(range(13)))
+        results.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
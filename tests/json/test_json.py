@@ -1,7 +1,11 @@
+import json
+import os
 import shutil
+import stat
 import tempfile
 import unittest
 from os import path
+from unittest import mock
 
 import cdda_tools
 
@@ -22,6 +26,19 @@ class TestJson(unittest.TestCase):
         data = cdda_tools.json_utils.read_json(temp_path)
         self.assertEqual(data, {"a": 1, "b": "Hallo"})
 
+    def test_read_json_header(self):
+        temp_path = path.join(self.test_dir, "test.json")
+        content = '# version 33\n{"a": 1, "b": "Hall\u00f6"}'.encode("utf-8")
+        with open(temp_path, "wb") as file:
+            file.write(content)
+
+        stats = cdda_tools.json_utils.STATS
+        stats.reset()
+        data = cdda_tools.json_utils.read_json(temp_path)
+        self.assertEqual(data, {"a": 1, "b": "Hall\u00f6"})
+        self.assertEqual(stats.files_read, 1)
+        self.assertEqual(stats.bytes_read, len(content))
+
     def test_write_json(self):
         temp_path = path.join(self.test_dir, "test.json")
         data = {"a": 1, "b": "Hallo"}
@@ -32,6 +49,150 @@ class TestJson(unittest.TestCase):
         self.assertEqual(data, {"a": 1, "b": "Hallo"})
         self.assertEqual(data2, {"a": 1, "b": "Hallo"})
 
+    def test_write_json_unchanged(self):
+        temp_path = path.join(self.test_dir, "test.sav")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write('# version 33\n{"a":1,"b":"Hallo"}')
+        os.chmod(temp_path, 0o640)
+
+        data = cdda_tools.json_utils.read_json(temp_path)
+        self.assertFalse(cdda_tools.json_utils.write_json(data, temp_path))
+
+        data["a"] = 2
+        self.assertTrue(cdda_tools.json_utils.write_json(data, temp_path))
+        with open(temp_path, "rb") as file:
+            self.assertEqual(file.read(), b'# version 33\n{"a":2,"b":"Hallo"}')
+        self.assertEqual(stat.S_IMODE(os.stat(temp_path).st_mode), 0o640)
+        self.assertEqual(os.listdir(self.test_dir), ["test.sav"])
+
+    def test_backends(self):
+        data = {
+            "a": [1, -2.5, 0.001, 1e16, 1e-7, -0.0, 9223372036854775807, True, None],
+            "b": 'Hallo Welt \u00fc \u2603 \\ "',
+            "c": {"d": [], "e": {}},
+        }
+        text = '# version 33\n{"a": 1, "b": [NaN, "x"]}'
+        expected = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        expected = expected.encode("utf-8")
+
+        backend = cdda_tools.json_utils.get_backend()
+        try:
+            for name in cdda_tools.json_utils.BACKENDS:
+                cdda_tools.json_utils.set_backend(name)
+                temp_path = path.join(self.test_dir, "test.json")
+                cdda_tools.json_utils.write_json(data, temp_path)
+                with open(temp_path, "rb") as file:
+                    self.assertEqual(file.read(), expected)
+                self.assertEqual(cdda_tools.json_utils.read_json(temp_path), data)
+
+                header_path = path.join(self.test_dir, "header.json")
+                with open(header_path, "w", encoding="utf-8") as file:
+                    file.write(text)
+                read = cdda_tools.json_utils.read_json(header_path)
+                self.assertEqual(read["a"], 1)
+                self.assertEqual(read["b"][1], "x")
+        finally:
+            cdda_tools.json_utils.set_backend(backend.name)
+
+        with self.assertRaises(ValueError):
+            cdda_tools.json_utils.set_backend("abcdefg")
+
+    def test_compressed(self):
+        compression = cdda_tools.json_utils.compression
+        temp_path = path.join(self.test_dir, "test.sav")
+        for name in compression.FORMATS:
+            with open(temp_path, "wb") as file:
+                file.write(compression.compress(b'# version 33\n{"a":1}', name))
+
+            data = cdda_tools.json_utils.read_json(temp_path)
+            self.assertEqual(data, {"a": 1})
+            self.assertFalse(cdda_tools.json_utils.write_json(data, temp_path))
+
+            data["a"] = 2
+            self.assertTrue(cdda_tools.json_utils.write_json(data, temp_path))
+            with open(temp_path, "rb") as file:
+                self.assertEqual(compression.detect(file.read()), name)
+            content, file_compression = compression.read_file(temp_path)
+            self.assertEqual(content, b'# version 33\n{"a":2}')
+            self.assertEqual(file_compression, name)
+
+    def test_file_contains_compressed(self):
+        compression = cdda_tools.json_utils.compression
+        temp_path = path.join(self.test_dir, "test.map")
+        content = ("x" * 100 + "My Vehicle" + "x" * 100).encode("utf-8")
+        with mock.patch("cdda_tools.commands.util.SEARCH_CHUNK_SIZE", 16):
+            for name in [None] + list(compression.FORMATS):
+                with open(temp_path, "wb") as file:
+                    file.write(compression.compress(content, name))
+                self.assertTrue(
+                    cdda_tools.commands.util.file_contains(temp_path, "My Vehicle")
+                )
+                self.assertFalse(
+                    cdda_tools.commands.util.file_contains(temp_path, "Other")
+                )
+
+    def test_read_value(self):
+        temp_path = path.join(self.test_dir, "test.sav")
+        data = {
+            "active_monsters": [{"name": "zombie", "pos": [1, 2, 0]}] * 100,
+            "nested": {"player": {"name": "Wrong"}},
+            "note": 'C:\\ "player": {"name": "Wrong"}',
+            "player": {"inv": [{"name": "Wrong"}], "id": 1, "name": 'Hans "D\u00f6"'},
+        }
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write("# version 33\n")
+            json.dump(data, file)
+
+        scan = cdda_tools.json_utils.scan
+        with mock.patch("cdda_tools.json_utils.scan.CHUNK_SIZE", 7):
+            self.assertEqual(
+                scan.read_value(temp_path, ["player", "name"]), 'Hans "D\u00f6"'
+            )
+            self.assertEqual(scan.read_value(temp_path, ["player", "id"]), 1)
+            self.assertIsNone(scan.read_value(temp_path, ["player", "age"]))
+            self.assertIsNone(scan.read_value(temp_path, ["monsters"]))
+            self.assertEqual(
+                scan.read_values(
+                    temp_path, [["player", "id"], ["monsters"], ["nested", "player"]]
+                ),
+                [1, None, {"name": "Wrong"}],
+            )
+
+    def test_read_value_chunk_boundary(self):
+        temp_path = path.join(self.test_dir, "test.sav")
+        scan = cdda_tools.json_utils.scan
+        for number, cut in [("-2.5", "-2."), ("1e+20", "1e")]:
+            prefix = '{"padding": "'
+            suffix = '", "value": '
+            padding = scan.CHUNK_SIZE - len(prefix) - len(suffix) - len(cut)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.write(prefix + "x" * padding + suffix + number + "}")
+
+            self.assertEqual(scan.read_value(temp_path, ["value"]), float(number))
+
+    def test_player_roster(self):
+        cache_dir = path.join(self.test_dir, "cache")
+        for i, name in enumerate(["Hans", "Grete"]):
+            with open(
+                path.join(self.test_dir, f"#{i}.sav"), "w", encoding="utf-8"
+            ) as file:
+                json.dump({"player": {"name": name}}, file)
+
+        util = cdda_tools.commands.util
+        save, save_name, player = util.get_save_path(self.test_dir, "Grete", cache_dir)
+        self.assertEqual(save, path.join(self.test_dir, "#1.sav"))
+        self.assertEqual(save_name, "#1")
+        self.assertEqual(player, "Grete")
+
+        with mock.patch("cdda_tools.json_utils.scan.read_value") as read_value:
+            util.get_save_path(self.test_dir, "Grete", cache_dir)
+            read_value.assert_not_called()
+
+        with open(path.join(self.test_dir, "#1.sav"), "w", encoding="utf-8") as file:
+            json.dump({"player": {"name": "Gretel"}}, file)
+        with self.assertRaises(ValueError):
+            util.get_save_path(self.test_dir, "Grete", cache_dir)
+
 
 if __name__ == "__main__":
     unittest.main
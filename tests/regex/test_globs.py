@@ -0,0 +1,40 @@
+import unittest
+
+from cdda_tools.globs import GlobMatcher
+
+
+class TestGlobMatcher(unittest.TestCase):
+    def test_include(self):
+        matcher = GlobMatcher(["*wrench*", "hammer"])
+        self.assertTrue(matcher("socket_wrench_set"))
+        self.assertTrue(matcher("hammer"))
+        self.assertFalse(matcher("hammer_sledge"))
+        self.assertFalse(matcher("Wrench"))
+
+    def test_ignore(self):
+        matcher = GlobMatcher(["*moose*"], ignore=["*dead*"])
+        self.assertTrue(matcher("moose pack"))
+        self.assertFalse(matcher("dead moose"))
+
+    def test_case_insensitive(self):
+        matcher = GlobMatcher(["*Moose*"], ignore=["*DEAD*"], case_sensitive=False)
+        self.assertTrue(matcher("moose"))
+        self.assertTrue(matcher("MOOSE"))
+        self.assertFalse(matcher("Dead Moose"))
+
+    def test_no_patterns(self):
+        matcher = GlobMatcher([])
+        self.assertFalse(matcher("anything"))
+
+    def test_memoized(self):
+        matcher = GlobMatcher(["road_*"], cache_size=2)
+        for terrain in ["road_ns", "field", "road_ns", "road_ew"]:
+            matcher(terrain)
+        info = matcher._matches.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 3)
+        self.assertEqual(info.currsize, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
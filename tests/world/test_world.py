@@ -0,0 +1,196 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from os import path
+from unittest import mock
+
+import cdda_tools
+
+
+class TestVehicleIndex(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.maps_dir = path.join(self.test_dir, "maps")
+        self.cache_dir = path.join(self.test_dir, "cache")
+
+        self._write_map("0.0.0/1.2.0.map", [[1, 2, 0, ["Car", "Bike"]]])
+        self._write_map("0.0.0/3.4.0.map", [[3, 4, 0, []], [4, 4, 0, ["Truck"]]])
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def _write_map(self, rel_path, submaps):
+        file = path.join(self.maps_dir, rel_path)
+        os.makedirs(path.dirname(file), exist_ok=True)
+        content = [
+            {"coordinates": [x, y, z], "vehicles": [{"name": n} for n in names]}
+            for x, y, z, names in submaps
+        ]
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(content, f)
+        return file
+
+    def test_vehicle_index(self):
+        world = cdda_tools.world
+        index = world.read_vehicle_index(self.maps_dir, self.cache_dir)
+        self.assertEqual(
+            index["Truck"],
+            [(path.join(self.maps_dir, "0.0.0", "3.4.0.map"), (4, 4, 0))],
+        )
+        self.assertEqual(set(index), {"Car", "Bike", "Truck"})
+
+        with mock.patch(
+            "cdda_tools.json_utils.read_json", wraps=cdda_tools.json_utils.read_json
+        ) as read_json:
+            self.assertEqual(
+                world.read_vehicle_index(self.maps_dir, self.cache_dir), index
+            )
+            self.assertEqual(read_json.call_count, 0)
+
+            self._write_map("0.0.0/1.2.0.map", [[1, 2, 0, ["Renamed Car", "Bike"]]])
+            index = world.read_vehicle_index(self.maps_dir, self.cache_dir)
+            self.assertEqual(read_json.call_count, 1)
+
+        self.assertNotIn("Car", index)
+        self.assertIn("Renamed Car", index)
+
+    def test_find_vehicle_files(self):
+        util = cdda_tools.commands.util
+        for cache_dir in [None, self.cache_dir]:
+            files = util.find_vehicle_files(self.test_dir, "Bike", cache_dir)
+            self.assertEqual(files, [path.join(self.maps_dir, "0.0.0", "1.2.0.map")])
+
+    def test_find_files_with_text(self):
+        util = cdda_tools.commands.util
+        for i in range(10):
+            self._write_map(f"0.0.0/{i}.0.0.map", [[i, 0, 0, ["Van"]]])
+
+        for workers in [1, 3]:
+            files = util.find_files_with_text(self.maps_dir, "Van", workers=workers)
+            self.assertEqual(len(files), 10)
+            files = util.find_files_with_text(
+                self.maps_dir, "Van", max_hits=2, workers=workers
+            )
+            self.assertEqual(len(files), 2)
+            files = util.find_files_with_text(
+                self.maps_dir, "Truck", max_hits=2, workers=workers
+            )
+            self.assertEqual(files, [path.join(self.maps_dir, "0.0.0", "3.4.0.map")])
+
+    def test_terrain_index(self):
+        world = cdda_tools.world
+        overmap = path.join(self.test_dir, "o.0.0")
+        seen = path.join(self.test_dir, "#P.seen.0.0")
+        with open(overmap, "w", encoding="utf-8") as f:
+            json.dump({"layers": [[["field", 2], ["lab", 3], ["field", 5]]]}, f)
+        with open(seen, "w", encoding="utf-8") as f:
+            json.dump({"visible": [[[False, 3], [True, 7]]]}, f)
+
+        index = world.read_terrain_index(self.test_dir, [overmap], self.cache_dir)
+        self.assertEqual(list(index[overmap][0]["field"]), [0, 2, 5, 5])
+        self.assertEqual(list(index[overmap][0]["lab"]), [2, 3])
+
+        seen_index = world.read_seen_index(self.test_dir, [seen], self.cache_dir)
+        self.assertEqual(
+            list(world.mask_indices(seen_index[seen][0])), list(range(3, 10))
+        )
+
+        with mock.patch("cdda_tools.json_utils.read_json") as read_json:
+            self.assertEqual(
+                world.read_terrain_index(self.test_dir, [overmap], self.cache_dir),
+                index,
+            )
+            world.read_seen_index(self.test_dir, [seen], self.cache_dir)
+            read_json.assert_not_called()
+
+        with open(overmap, "w", encoding="utf-8") as f:
+            json.dump({"layers": [[["lab", 10]]]}, f)
+        index = world.read_terrain_index(self.test_dir, [overmap], self.cache_dir)
+        self.assertEqual(list(index[overmap][0]), ["lab"])
+
+    def test_player_position(self):
+        util = cdda_tools.commands.util
+        sav = path.join(self.test_dir, "#P.sav")
+        with open(sav, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "om_x": 1,
+                    "om_y": -1,
+                    "levx": 150,
+                    "levy": 20,
+                    "player": {"name": "P", "posx": 60, "posy": 60},
+                },
+                f,
+            )
+        self.assertEqual(util.get_player_position(sav), (257, -168))
+
+        with open(sav, "w", encoding="utf-8") as f:
+            json.dump({"player": {"name": "P", "location": [4824, -2, 0]}}, f)
+        self.assertEqual(util.get_player_position(sav), (201, -1))
+
+
+class TestLayers(unittest.TestCase):
+    def test_rle_mask(self):
+        world = cdda_tools.world
+        seen = [[False, 3], [True, 2], [False, 1], [True, 4]]
+        mask = world.rle_mask(seen)
+        self.assertEqual(list(world.mask_indices(mask)), [3, 4, 6, 7, 8, 9])
+
+        terrain = [["field", 2], ["forest", 3], ["road", 2], ["forest_thick", 3]]
+        forest = world.rle_mask(terrain, lambda t: t.startswith("forest"))
+        self.assertEqual(list(world.mask_indices(forest)), [2, 3, 4, 7, 8, 9])
+        self.assertEqual(list(world.mask_indices(forest & mask)), [3, 4, 7, 8, 9])
+
+        self.assertEqual(world.rle_mask([]), 0)
+        self.assertEqual(list(world.mask_indices(0)), [])
+
+    def test_submap_items(self):
+        world = cdda_tools.world
+        wrench = {"typeid": "wrench"}
+        backpack = {
+            "typeid": "backpack",
+            "contents": {"contents": [{"pocket_type": 2, "contents": [wrench]}]},
+        }
+        box = {"typeid": "box", "contents": [wrench, wrench]}
+        submap = {"items": [1, 2, [wrench, [backpack, 2]], 3, 4, [box]]}
+
+        items = [
+            (x, y, item["typeid"], count)
+            for x, y, item, count in world.submap_items(submap)
+        ]
+        self.assertEqual(
+            items,
+            [
+                (1, 2, "wrench", 1),
+                (1, 2, "backpack", 2),
+                (1, 2, "wrench", 2),
+                (3, 4, "box", 1),
+                (3, 4, "wrench", 1),
+                (3, 4, "wrench", 1),
+            ],
+        )
+
+    def test_terrain_layer(self):
+        world = cdda_tools.world
+        table = world.TerrainTable()
+        terrain = [["field", 2], ["forest", 3], ["road", 2], ["forest", 3]]
+        layer = world.TerrainLayer(terrain, table)
+        other = world.TerrainLayer([["road", 5], ["lake", 5]], table)
+
+        self.assertEqual(table.terrains, ["field", "forest", "road", "lake"])
+        self.assertEqual(layer.codes, {0, 1, 2})
+        self.assertEqual(other.codes, {2, 3})
+        self.assertEqual(
+            [layer.terrain(i) for i in [0, 2, 5, 9]],
+            ["field", "forest", "road", "forest"],
+        )
+
+        forest = layer.mask({table.code("forest")})
+        self.assertEqual(list(world.mask_indices(forest)), [2, 3, 4, 7, 8, 9])
+        self.assertEqual(layer.mask({table.code("lake")}), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()